@@ -0,0 +1,174 @@
+# adaptive.py
+import math, mmap, os, random, sqlite3, struct, threading
+from array import array
+
+from history_store import file_lock
+from sampling import sample_questions
+
+STATS_FILE = "adaptive_stats.bin"
+USERS_FILE = "adaptive_users.db"
+
+# Per-question slot: attempts, correct, score_sum (0..1), time_sum, rating
+FIELDS = ("attempts", "correct", "score_sum", "time_sum", "rating")
+SLOT = len(FIELDS)
+DIFFICULTY_PRIOR = {"Easy": -1.0, "Medium": 0.0, "Hard": 1.0}
+CANDIDATES = 8
+
+def expected(theta, b):
+    # Rasch / Elo: probability a user of ability theta answers an item of
+    # difficulty b correctly.
+    return 1.0 / (1.0 + math.exp(b - theta))
+
+def k_factor(n):
+    return max(0.1, 0.6 / math.sqrt(1 + n))
+
+# -------------------------------
+# Engine
+# -------------------------------
+class AdaptiveEngine:
+    # Question stats live in a shared mmap of float64 slots, so updates
+    # touch only the answered questions and every worker process sees the
+    # same numbers. Each stable question id owns a slot for good (table
+    # "slots"), so rebuilding the bank keeps the stats. Ratings are NaN until
+    # first updated and fall back to the difficulty label's prior. Per-user
+    # abilities are one SQLite row each, so recording a submission touches
+    # a single row.
+    def __init__(self, bank, path=STATS_FILE, users_path=USERS_FILE):
+        self.path = path
+        self.users_path = users_path
+        self._local = threading.local()
+        with self._conn() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS users (user TEXT PRIMARY KEY, theta REAL, n INTEGER)")
+            con.execute("CREATE TABLE IF NOT EXISTS slots (id TEXT PRIMARY KEY, slot INTEGER)")
+            con.execute("CREATE TABLE IF NOT EXISTS applied (id TEXT PRIMARY KEY)")
+        self.priors = []
+        self.sections = {}
+        for section in bank.sections():
+            ranges = [bank.indices(section, d) for d in bank.difficulties(section)]
+            for d, ids in zip(bank.difficulties(section), ranges):
+                self.priors.append((ids, DIFFICULTY_PRIOR.get(d, 0.0)))
+            if ranges:
+                self.sections[section] = range(min(r.start for r in ranges), max(r.stop for r in ranges))
+        self._open(self._assign_slots(bank))
+
+    def _assign_slots(self, bank):
+        # Maps this bank's qids to slots, giving new ids the next free ones.
+        # Returns the number of slots in use.
+        ids = [bank.question_id(qid) for qid in range(len(bank))]
+        con = self._conn()
+        with file_lock(self.path), con:
+            slots = dict(con.execute("SELECT id, slot FROM slots"))
+            if not slots and os.path.exists(self.path) and os.path.getsize(self.path):
+                # A stats file from before the slot map, indexed by the qids
+                # of the bank it was written with.
+                slots = {i: qid for qid, i in reversed(list(enumerate(ids)))}
+                con.executemany("INSERT INTO slots (id, slot) VALUES (?,?)", slots.items())
+            count = max(slots.values(), default=-1) + 1
+            new = []
+            for i in ids:
+                if i not in slots:
+                    slots[i] = count
+                    new.append((i, count))
+                    count += 1
+            con.executemany("INSERT INTO slots (id, slot) VALUES (?,?)", new)
+        self._slot = array("q", (slots[i] for i in ids))
+        return count
+
+    def _open(self, count):
+        size = max(count, 1) * SLOT * 8
+        with file_lock(self.path):
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                have = os.fstat(fd).st_size
+                if have < size:
+                    # New slots: zero counters, NaN rating.
+                    blank = struct.pack(f"{SLOT}d", *([0.0] * (SLOT - 1)), float("nan"))
+                    os.pwrite(fd, blank * ((size - have) // (8 * SLOT)), have)
+                self._mm = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+        self._slots = memoryview(self._mm).cast("d")
+
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.users_path, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def _user(self, user):
+        if not user:
+            return 0.0, 0
+        row = self._conn().execute("SELECT theta, n FROM users WHERE user = ?", (user,)).fetchone()
+        return tuple(row) if row else (0.0, 0)
+
+    def rating(self, qid):
+        b = self._slots[self._slot[qid] * SLOT + 4]
+        if b == b:  # not NaN
+            return b
+        for ids, prior in self.priors:
+            if qid in ids:
+                return prior
+        return 0.0
+
+    def question_stats(self, qid):
+        base = self._slot[qid] * SLOT
+        row = dict(zip(FIELDS, self._slots[base:base + SLOT]))
+        n = row["attempts"] or 1
+        row["rating"] = self.rating(qid)
+        row["accuracy"] = row["correct"] / n
+        row["mean_score"] = row["score_sum"] / n
+        row["mean_time"] = row["time_sum"] / n
+        return row
+
+    def ability(self, user):
+        return self._user(user)[0]
+
+    def update_theta(self, theta, n, qid, outcome):
+        return theta + k_factor(n) * (outcome - expected(theta, self.rating(qid)))
+
+    def pick(self, section, theta, seen=None, rng=None, exclude=()):
+        # Constant work per pick: score a fixed number of random candidates
+        # and serve the most informative one (expected success nearest 50%).
+        pool = self.sections.get(section, range(0))
+        candidates = sample_questions(pool, CANDIDATES, rng or random, seen)
+        candidates = [qid for qid in candidates if qid not in exclude]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda qid: abs(self.rating(qid) - theta))
+
+    def record(self, user, qids, outcomes, times, key=None):
+        # outcomes are normalized to 0..1; only the answered slots are touched.
+        # Anonymous attempts (no user) still update the question stats.
+        # With a key (the submission id) a repeated call is a no-op, so a
+        # retried or replayed submission is counted once.
+        with file_lock(self.path):
+            con = self._conn()
+            theta, n = self._user(user)
+            if key and con.execute("SELECT 1 FROM applied WHERE id = ?", (key,)).fetchone():
+                return theta
+            updates = []
+            for qid, s, t in zip(qids, outcomes, times):
+                base = self._slot[qid] * SLOT
+                attempts = self._slots[base]
+                b = self.rating(qid)
+                p = expected(theta, b)
+                updates.append((base, attempts + 1, 1 if s >= 0.5 else 0, s, t, b - k_factor(attempts) * (s - p)))
+                theta += k_factor(n) * (s - p)
+                n += 1
+            # Commit the user and the key before touching the slots, so a
+            # failure here leaves nothing half-applied to retry on top of.
+            with con:
+                if user:
+                    con.execute("INSERT OR REPLACE INTO users (user, theta, n) VALUES (?,?,?)", (user, theta, n))
+                if key:
+                    con.execute("INSERT INTO applied (id) VALUES (?)", (key,))
+            for base, attempts, correct, s, t, rating in updates:
+                self._slots[base] = attempts
+                self._slots[base + 1] += correct
+                self._slots[base + 2] += s
+                self._slots[base + 3] += t
+                self._slots[base + 4] = rating
+        return theta
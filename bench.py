@@ -0,0 +1,301 @@
+# bench.py
+"""Benchmark the grading, sampling and history I/O hot paths.
+
+    python bench.py [--scales 1000,100000,1000000] [--backend jsonl] [--output bench.json]
+
+Synthetic banks and histories are generated (seeded) in a temporary
+directory for each scale. Every benchmark reports latency percentiles and
+the traced memory peak of one extra call, and the whole run is written as
+JSON so runs can be diffed. Once per run (not per scale), "startup"
+compares the page's cold-start imports against the old eager import set,
+and "app" times the first paint and reruns of app.py through Streamlit's
+AppTest in a scratch directory seeded with --app-records history records;
+point --app at an older checkout's app.py for a before/after.
+"""
+import argparse, json, os, platform, random, subprocess, sys, tempfile, time, tracemalloc
+from datetime import datetime, timedelta
+
+from history_store import BACKENDS, HistoryCache
+from question_bank import CompiledBank, DictBank, compile_bank
+from sampling import SeenSet, sample_questions
+
+SECTIONS = ["Practice", "Mock Interview", "MCQ Quiz", "Pseudocode"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+WORDS = (
+    "array stack queue linked list tree graph hash map heap sort search "
+    "recursion pointer memory index node edge cycle path dynamic greedy "
+    "binary merge quick insert delete update value key order time space"
+).split()
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGE_MODULES = ["history_store", "question_bank", "sampling", "adaptive", "rollups", "profiling", "submissions", "exam_sessions"]
+
+# -------------------------------
+# Synthetic data
+# -------------------------------
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def synthetic_bank(size, rng):
+    bank = {s: {d: [] for d in DIFFICULTIES} for s in SECTIONS}
+    for i in range(size):
+        section = SECTIONS[i % len(SECTIONS)]
+        diff = DIFFICULTIES[(i // len(SECTIONS)) % len(DIFFICULTIES)]
+        answer = _sentence(rng, 6)
+        options = [answer] + [_sentence(rng, 6) for _ in range(3)]
+        rng.shuffle(options)
+        bank[section][diff].append({"q": f"Q{i} {_sentence(rng, 8)}", "a": answer, "options": options})
+    return bank
+
+def synthetic_record(rng, i, start):
+    section = rng.choice(SECTIONS)
+    return {
+        "id": f"bench-{i}",
+        "section": section,
+        "difficulty": rng.choice(DIFFICULTIES),
+        "timestamp": (start + timedelta(seconds=30 * i)).isoformat(),
+        "score": round(rng.uniform(0, 100), 2),
+        "details": [{"q": f"Q{rng.randrange(1000)}", "answer": _sentence(rng, 5), "score": 0.0} for _ in range(3)],
+    }
+
+def fill_history(store, size, rng, batch=10000):
+    start = datetime(2025, 1, 1)
+    for lo in range(0, size, batch):
+        store.append_many([synthetic_record(rng, i, start) for i in range(lo, min(lo + batch, size))])
+
+# -------------------------------
+# Timing
+# -------------------------------
+def _percentile(sorted_ms, p):
+    return sorted_ms[min(len(sorted_ms) - 1, int(round(p / 100 * (len(sorted_ms) - 1))))]
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "repeat": len(samples),
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "p50_ms": round(_percentile(samples, 50), 4),
+        "p90_ms": round(_percentile(samples, 90), 4),
+        "p99_ms": round(_percentile(samples, 99), 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dict(summarize(samples), peak_kib=round(peak / 1024, 1))
+
+# -------------------------------
+# Benchmarks
+# -------------------------------
+# Each takes (ctx) and yields (name, fn, repeat) after doing its own setup.
+def bench_sampling(ctx):
+    bank, rng = ctx["bank"], ctx["rng"]
+    ids = bank.indices("Practice", "Easy")
+    yield "sampling.pick_15", lambda: sample_questions(ids, 15, rng), 1000
+    seen = SeenSet(len(bank))
+    def pick_seen():
+        seen.update(sample_questions(ids, 15, rng, seen))
+    yield "sampling.pick_15_seen", pick_seen, 1000
+    yield "bank.question", lambda: bank.question(rng.randrange(len(bank))), 1000
+
+def bench_compiled_bank(ctx):
+    path = os.path.join(ctx["tmp"], "bank.qbk")
+    yield "bank.compile", lambda: compile_bank(ctx["bank"], path), 1
+    compiled = CompiledBank(path)
+    yield "bank.compiled_open", lambda: CompiledBank(path), 5
+    yield "bank.compiled_question", lambda: compiled.question(ctx["rng"].randrange(len(compiled))), 1000
+
+def bench_grading(ctx):
+    from scoring import grade_attempts, make_scorer, reference_answers
+    bank, rng = ctx["bank"], ctx["rng"]
+    scorer = None
+    def fit():
+        nonlocal scorer
+        scorer = make_scorer(bank, ctx["scorer"])
+    yield "grading.fit", fit, 1
+    refs = reference_answers(bank)
+    yield "grading.similarity", lambda: scorer.similarity(_sentence(rng, 6), rng.choice(refs)), 500
+    qs = [bank.question(qid) for qid in sample_questions(bank.indices("Practice", "Easy"), 10, rng)]
+    attempts = [("Practice", qs, [_sentence(rng, 6) for _ in qs]) for _ in range(100)]
+    yield "grading.batch_100x10", lambda: grade_attempts(scorer, attempts), 10
+
+def bench_history(ctx):
+    store, rng = ctx["store"], ctx["rng"]
+    n = [ctx["scale"]]
+    def append():
+        store.append(synthetic_record(rng, n[0], datetime(2026, 1, 1)))
+        n[0] += 1
+    yield "history.append", append, 200
+    repeat = 3 if ctx["scale"] <= 100000 else 1
+    yield "history.load_all", store.load_all, repeat
+    cache = HistoryCache(store)
+    yield "history.cache_cold", lambda: HistoryCache(store).refresh(), repeat
+    cache.refresh()
+    def incremental():
+        append()
+        cache.refresh()
+    yield "history.cache_incremental", incremental, 200
+    yield "history.page_query", lambda: cache.query(section="Practice", offset=40, limit=20), 1000
+
+def bench_frame(ctx):
+    import pandas  # noqa: F401  (skip cleanly when pandas is missing)
+    repeat = 3 if ctx["scale"] <= 100000 else 1
+    yield "analytics.frame", lambda: HistoryCache(ctx["store"]).refresh().frame(), repeat
+
+def bench_rollups(ctx):
+    from rollups import load_rollups, rebuild_rollups
+    path = os.path.join(ctx["tmp"], "rollups.json")
+    yield "analytics.rollups_rebuild", lambda: rebuild_rollups(ctx["store"], path), 1
+    yield "analytics.rollups_read", lambda: load_rollups(ctx["store"], path).rows("section"), 1000
+
+def _run_in_subprocess(code):
+    # Fresh interpreter in the repo directory, so the app modules resolve
+    # wherever bench.py is started from. A failure (e.g. a package that is
+    # not installed) is raised as ImportError and skips the benchmark.
+    def run():
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode:
+            raise ImportError((proc.stderr.strip().splitlines() or [f"exit status {proc.returncode}"])[-1])
+    return run
+
+def _import_in_subprocess(modules):
+    return _run_in_subprocess("import " + ", ".join(modules))
+
+def bench_startup(ctx):
+    # Fresh interpreters, so these are cold-start import costs.
+    yield "startup.page_imports", _import_in_subprocess(PAGE_MODULES), 5
+
+def bench_startup_eager(ctx):
+    # The "before": what app.py imported on every cold start while numpy,
+    # pandas, plotly and sklearn were still module-level imports.
+    yield "startup.eager_imports", _import_in_subprocess(
+        PAGE_MODULES + ["scoring", "numpy", "pandas", "plotly.express", "sklearn.feature_extraction.text"]
+    ), 3
+
+def bench_startup_grading(ctx):
+    import sklearn  # noqa: F401  (skip cleanly when sklearn is missing)
+    yield "startup.grading_imports", _import_in_subprocess(["scoring", "sklearn.feature_extraction.text"]), 3
+
+def bench_startup_analytics(ctx):
+    import pandas, plotly  # noqa: F401
+    yield "startup.analytics_imports", _import_in_subprocess(["pandas", "plotly.express"]), 3
+
+# The real page through Streamlit's AppTest, run in a scratch directory
+# seeded with a synthetic history so the repo's own files are never
+# touched. first_paint is the first run in a fresh interpreter (imports
+# included); rerun is every run after that in the same session.
+APP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+samples = []
+for _ in range(1 + int(sys.argv[2])):
+    t0 = time.perf_counter()
+    at.run()
+    samples.append((time.perf_counter() - t0) * 1000)
+print(json.dumps({"samples": samples, "errors": [e.message for e in at.exception]}))
+"""
+
+def bench_app(app, records, seed, log, paints=3, reruns=20):
+    import streamlit  # noqa: F401  (skip cleanly when streamlit is missing)
+    with tempfile.TemporaryDirectory() as tmp:
+        fill_history(BACKENDS["jsonl"](os.path.join(tmp, "history.jsonl")), records, random.Random(seed))
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(app)), HISTORY_BACKEND="jsonl")
+        env.pop("SHARED_STORE_URL", None)
+        first, rest = [], []
+        for i in range(paints):
+            n = reruns if i == paints - 1 else 0
+            proc = subprocess.run(
+                [sys.executable, "-c", APP_SCRIPT, os.path.abspath(app), str(n)],
+                cwd=tmp, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode:
+                raise ImportError((proc.stderr.strip().splitlines() or [f"exit status {proc.returncode}"])[-1])
+            out = json.loads(proc.stdout.strip().splitlines()[-1])
+            if out["errors"]:
+                log(f"[app] script raised: {out['errors'][0]}")
+            first.append(out["samples"][0])
+            rest.extend(out["samples"][1:])
+    return {"records": records, "app.first_paint": summarize(first), "app.rerun": summarize(rest)}
+
+STARTUP_BENCHES = [bench_startup, bench_startup_eager, bench_startup_grading, bench_startup_analytics]
+BENCHES = [bench_sampling, bench_compiled_bank, bench_grading, bench_history, bench_frame, bench_rollups]
+
+# -------------------------------
+# Driver
+# -------------------------------
+def run_benches(benches, ctx, results, log, tag):
+    for bench in benches:
+        try:
+            for name, fn, repeat in bench(ctx):
+                results[name] = measure(fn, repeat)
+                log(f"[{tag}] {name}: p50 {results[name]['p50_ms']} ms, p99 {results[name]['p99_ms']} ms")
+        except ImportError as e:  # e.g. numpy/sklearn/pandas missing
+            results[bench.__name__] = {"skipped": str(e)}
+            log(f"[{tag}] {bench.__name__} skipped: {e}")
+    return results
+
+def run_scale(scale, backend, scorer, seed, log):
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        bank = DictBank(synthetic_bank(scale, rng))
+        store = BACKENDS[backend](os.path.join(tmp, "history." + backend))
+        fill_history(store, scale, rng)
+        log(f"[{scale}] generated data in {time.perf_counter() - t0:.1f}s")
+        ctx = {"scale": scale, "bank": bank, "store": store, "rng": rng, "tmp": tmp, "scorer": scorer}
+        return run_benches(BENCHES, ctx, results, log, scale)
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark grading, sampling and history I/O.")
+    p.add_argument("--scales", default="1000,100000,1000000")
+    p.add_argument("--backend", default="jsonl", choices=sorted(BACKENDS))
+    p.add_argument("--scorer", default="tfidf")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--app", default=os.path.join(ROOT, "app.py"), help="page to time with AppTest (e.g. an older checkout's)")
+    p.add_argument("--app-records", type=int, default=10000, help="history records seeded for the app run")
+    p.add_argument("--output", help="write JSON results here (default: stdout)")
+    args = p.parse_args(argv)
+    log = lambda msg: print(msg, file=sys.stderr)
+    report = {
+        "started": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "scorer": args.scorer,
+        "seed": args.seed,
+        "startup": run_benches(STARTUP_BENCHES, {}, {}, log, "startup"),
+        "scales": {},
+    }
+    try:
+        report["app"] = bench_app(args.app, args.app_records, args.seed, log)
+        log(f"[app] first paint p50 {report['app']['app.first_paint']['p50_ms']} ms, rerun p50 {report['app']['app.rerun']['p50_ms']} ms")
+    except ImportError as e:
+        report["app"] = {"skipped": str(e)}
+        log(f"[app] skipped: {e}")
+    for scale in (int(s) for s in args.scales.split(",")):
+        report["scales"][str(scale)] = run_scale(scale, args.backend, args.scorer, args.seed, log)
+    out = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+    else:
+        print(out)
+
+if __name__ == "__main__":
+    main()
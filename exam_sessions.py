@@ -0,0 +1,209 @@
+# exam_sessions.py
+import json, sqlite3, threading, time, uuid
+
+from shared_store import SHARED_STORE_URL, get_shared_store
+
+SESSIONS_FILE = "exam_sessions.db"
+SESSION_TTL = 7 * 24 * 3600  # an exam untouched this long is abandoned
+SWEEP_SECONDS = 300          # how often create() looks for abandoned exams
+HEADER_FIELDS = ("section", "topics", "diff", "qids", "times", "idx", "count", "theta", "start")
+
+# -------------------------------
+# Header encoding
+# -------------------------------
+# With a bank, questions are stored by stable id and mapped back to the
+# current qids on load, so a session survives the bank being rebuilt.
+# Questions that left the bank are dropped along with their answers.
+def encode_header(exam, bank=None):
+    header = {k: exam.get(k) for k in HEADER_FIELDS}
+    if bank is not None:
+        header["ids"] = [bank.question_id(qid) for qid in header.pop("qids")]
+    return json.dumps(header)
+
+def decode_header(header, answers, bank=None):
+    # answers: {position: text}. Returns (exam, dropped) or (None, True)
+    # when none of its questions are left.
+    exam = json.loads(header)
+    if "ids" in exam:
+        qids = [bank.qid_for(i) if bank is not None else None for i in exam.pop("ids")]
+    else:  # stored by qid (no bank, or written before stable ids)
+        qids = [qid if bank is None or qid < len(bank) else None for qid in exam["qids"]]
+    keep = [pos for pos, qid in enumerate(qids) if qid is not None]
+    if not keep:
+        return None, True
+    times = exam.get("times") or []
+    idx = exam.get("idx") or 0
+    exam["qids"] = [qids[pos] for pos in keep]
+    exam["answers"] = [answers.get(pos, "") for pos in keep]
+    exam["times"] = [times[pos] if pos < len(times) else 0.0 for pos in keep]
+    exam["idx"] = min(sum(pos < idx for pos in keep), len(keep) - 1)
+    exam["shown"] = time.time()
+    return exam, len(keep) < len(qids)
+
+# -------------------------------
+# Resumable exam sessions (SQLite, WAL)
+# -------------------------------
+class ExamSessionStore:
+    # An exam is a small header (question ids, timer start, position) plus
+    # one row per answer, so typing into one question rewrites one row.
+    def __init__(self, path=SESSIONS_FILE, bank=None, ttl=SESSION_TTL):
+        self.path = path
+        self.bank = bank
+        self.ttl = ttl
+        self._swept = 0.0
+        self._local = threading.local()
+        with self._conn() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id TEXT PRIMARY KEY, user TEXT, header TEXT, updated REAL)"
+            )
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " sid TEXT, idx INTEGER, answer TEXT, PRIMARY KEY (sid, idx))"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def create(self, user, exam):
+        exam["id"] = str(uuid.uuid4())
+        with self._conn() as con:
+            con.execute(
+                "INSERT INTO sessions (id, user, header, updated) VALUES (?,?,?,?)",
+                (exam["id"], user, self._header(exam), time.time()),
+            )
+        if time.monotonic() - self._swept > SWEEP_SECONDS:
+            self.sweep()
+        return exam["id"]
+
+    def sweep(self, now=None):
+        # Drops exams started but never submitted; returns how many.
+        self._swept = time.monotonic()
+        cutoff = (now or time.time()) - self.ttl
+        with self._conn() as con:
+            con.execute("DELETE FROM answers WHERE sid IN (SELECT id FROM sessions WHERE updated < ?)", (cutoff,))
+            return con.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,)).rowcount
+
+    def _header(self, exam):
+        return encode_header(exam, self.bank)
+
+    def save_header(self, exam):
+        with self._conn() as con:
+            con.execute(
+                "UPDATE sessions SET header = ?, updated = ? WHERE id = ?",
+                (self._header(exam), time.time(), exam["id"]),
+            )
+
+    def save_answer(self, sid, idx, answer):
+        with self._conn() as con:
+            con.execute(
+                "INSERT INTO answers (sid, idx, answer) VALUES (?,?,?)"
+                " ON CONFLICT (sid, idx) DO UPDATE SET answer = excluded.answer",
+                (sid, idx, answer),
+            )
+            con.execute("UPDATE sessions SET updated = ? WHERE id = ?", (time.time(), sid))
+
+    def load(self, sid):
+        con = self._conn()
+        row = con.execute("SELECT header FROM sessions WHERE id = ?", (sid,)).fetchone()
+        if row is None:
+            return None
+        answers = dict(con.execute("SELECT idx, answer FROM answers WHERE sid = ?", (sid,)))
+        exam, dropped = decode_header(row[0], answers, self.bank)
+        if exam is None:
+            self.finish(sid)
+            return None
+        exam["id"] = sid
+        if dropped:  # renumber the stored answers to the new positions
+            with self._conn() as con:
+                con.execute("DELETE FROM answers WHERE sid = ?", (sid,))
+                con.executemany(
+                    "INSERT INTO answers (sid, idx, answer) VALUES (?,?,?)",
+                    [(sid, i, a) for i, a in enumerate(exam["answers"]) if a],
+                )
+            self.save_header(exam)
+        return exam
+
+    def finish(self, sid):
+        with self._conn() as con:
+            con.execute("DELETE FROM answers WHERE sid = ?", (sid,))
+            con.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+# -------------------------------
+# Shared store (multi-worker deployments)
+# -------------------------------
+class SharedExamSessionStore:
+    # Same interface, kept in one hash per exam: field "header" plus one
+    # field per answer index, so an answer save is a single HSET. The
+    # "exam:index" hash maps each exam to its last update for the sweep.
+    INDEX_KEY = "exam:index"
+
+    def __init__(self, url=None, bank=None, ttl=SESSION_TTL):
+        self.kv = get_shared_store(url)
+        self.bank = bank
+        self.ttl = ttl
+        self._swept = 0.0
+
+    def _key(self, sid):
+        return f"exam:{sid}"
+
+    def _header(self, exam):
+        return encode_header(exam, self.bank)
+
+    def create(self, user, exam):
+        exam["id"] = str(uuid.uuid4())
+        self.kv.hset(self._key(exam["id"]), mapping={"user": user or "", "header": self._header(exam)})
+        self._touch(exam["id"])
+        if time.monotonic() - self._swept > SWEEP_SECONDS:
+            self.sweep()
+        return exam["id"]
+
+    def _touch(self, sid):
+        self.kv.hset(self.INDEX_KEY, sid, str(time.time()))
+
+    def sweep(self, now=None):
+        self._swept = time.monotonic()
+        cutoff = (now or time.time()) - self.ttl
+        stale = [sid for sid, t in self.kv.hgetall(self.INDEX_KEY).items() if float(t) < cutoff]
+        if stale:
+            self.kv.delete(*(self._key(sid) for sid in stale))
+            self.kv.hdel(self.INDEX_KEY, *stale)
+        return len(stale)
+
+    def save_header(self, exam):
+        self.kv.hset(self._key(exam["id"]), "header", self._header(exam))
+        self._touch(exam["id"])
+
+    def save_answer(self, sid, idx, answer):
+        self.kv.hset(self._key(sid), f"a{idx}", answer)
+        self._touch(sid)
+
+    def load(self, sid):
+        fields = self.kv.hgetall(self._key(sid))
+        if "header" not in fields:
+            return None
+        answers = {int(k[1:]): v for k, v in fields.items() if k.startswith("a") and k[1:].isdigit()}
+        exam, dropped = decode_header(fields["header"], answers, self.bank)
+        if exam is None:
+            self.finish(sid)
+            return None
+        exam["id"] = sid
+        if dropped:  # renumber the stored answers to the new positions
+            self.kv.delete(self._key(sid))
+            mapping = {f"a{i}": a for i, a in enumerate(exam["answers"]) if a}
+            self.kv.hset(self._key(sid), mapping=dict(mapping, user=fields.get("user", ""), header=self._header(exam)))
+        return exam
+
+    def finish(self, sid):
+        self.kv.delete(self._key(sid))
+        self.kv.hdel(self.INDEX_KEY, sid)
+
+def get_exam_session_store(bank=None):
+    return SharedExamSessionStore(bank=bank) if SHARED_STORE_URL else ExamSessionStore(bank=bank)
@@ -0,0 +1,235 @@
+# history_archive.py
+"""Export history and archive old attempts out of the hot store.
+
+    python history_archive.py export -o history.csv [--format csv|jsonl|parquet]
+                                     [--section S] [--start DATE] [--end DATE] [--no-archive]
+    python history_archive.py compact --older-than-days 90 [--segment-size 50000]
+
+export streams records (archived segments first, then the hot store) in
+constant memory; parquet needs pyarrow. compact moves attempts older than
+the cutoff into gzip-compressed columnar segments and then drops them
+from the hot store. Segments go next to the store (<store path>.archive/)
+or into $HISTORY_ARCHIVE_DIR; the shared backend needs the latter, on
+storage every worker host can read. Rollups are cumulative, so they are
+left as they are; a rollups rebuild reads the segments too.
+"""
+import argparse, csv, gzip, json, os, sys
+from datetime import datetime, timedelta
+
+from history_store import BACKENDS, HISTORY_BACKEND, file_lock, get_history_store
+
+COLUMNS = ("id", "section", "difficulty", "timestamp", "score", "details")
+HISTORY_ARCHIVE_DIR = os.environ.get("HISTORY_ARCHIVE_DIR")  # default: next to the store
+
+# -------------------------------
+# Segments
+# -------------------------------
+# A segment is gzip(JSON {column: [values]}); manifest.json lists them with
+# their time range and sections so filtered reads can skip whole segments.
+def archive_dir(store):
+    # None for a store without a local path (shared) and no configured dir.
+    if HISTORY_ARCHIVE_DIR:
+        return HISTORY_ARCHIVE_DIR
+    path = getattr(store, "path", None)
+    return path + ".archive" if path else None
+
+def _manifest_path(directory):
+    return os.path.join(directory, "manifest.json")
+
+def read_manifest(directory):
+    try:
+        with open(_manifest_path(directory), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"segments": [], "pending": None}
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def write_segment(directory, recs):
+    name = f"segment-{len(read_manifest(directory)['segments']):06d}.json.gz"
+    columns = {c: [r.get(c) for r in recs] for c in COLUMNS}
+    tmp = os.path.join(directory, name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(columns, f, default=str)
+    os.replace(tmp, os.path.join(directory, name))
+    stamps = [str(t or "") for t in columns["timestamp"]]
+    return {
+        "file": name, "count": len(recs),
+        "first_ts": min(stamps), "last_ts": max(stamps),
+        "sections": sorted({s or "Unknown" for s in columns["section"]}),
+    }
+
+def read_segment(directory, entry):
+    with gzip.open(os.path.join(directory, entry["file"]), "rt", encoding="utf-8") as f:
+        columns = json.load(f)
+    for row in zip(*(columns[c] for c in COLUMNS)):
+        yield dict(zip(COLUMNS, row))
+
+def iter_archive(directory, section=None, start=None, end=None):
+    if directory is None:
+        return
+    for entry in read_manifest(directory)["segments"]:
+        if section and section not in entry["sections"]:
+            continue
+        if (start and entry["last_ts"] < start) or (end and entry["first_ts"] > end):
+            continue
+        yield from read_segment(directory, entry)
+
+# -------------------------------
+# Export
+# -------------------------------
+def _matches(rec, section, start, end):
+    ts = str(rec.get("timestamp") or "")
+    return (
+        (not section or rec.get("section") == section)
+        and (not start or ts >= start)
+        and (not end or ts <= end)
+    )
+
+def iter_history(store, section=None, start=None, end=None, archived=True):
+    # start/end compare against ISO timestamps, as in HistoryCache.query.
+    if archived:
+        for rec in iter_archive(archive_dir(store), section, start, end):
+            if _matches(rec, section, start, end):
+                yield rec
+    for rec in store.iter_records():
+        if _matches(rec, section, start, end):
+            yield rec
+
+def _row(rec):
+    return [rec.get(c) if c != "details" else json.dumps(rec.get("details") or [], default=str) for c in COLUMNS]
+
+def export_history(records, out, fmt="csv", batch=10000):
+    # out is a text file for csv/jsonl and a path or binary file for parquet.
+    n = 0
+    if fmt == "jsonl":
+        for rec in records:
+            out.write(json.dumps(rec, default=str) + "\n")
+            n += 1
+    elif fmt == "csv":
+        w = csv.writer(out)
+        w.writerow(COLUMNS)
+        for rec in records:
+            w.writerow(_row(rec))
+            n += 1
+    elif fmt == "parquet":
+        import pyarrow as pa  # optional dependency, only needed for parquet
+        import pyarrow.parquet as pq
+        schema = pa.schema([
+            ("id", pa.string()), ("section", pa.string()), ("difficulty", pa.string()),
+            ("timestamp", pa.string()), ("score", pa.float64()), ("details", pa.string()),
+        ])
+        with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+            rows = []
+            for rec in records:
+                rows.append(_row(rec))
+                if len(rows) >= batch:
+                    writer.write_table(pa.Table.from_pylist([dict(zip(COLUMNS, r)) for r in rows], schema))
+                    n, rows = n + len(rows), []
+            if rows:
+                writer.write_table(pa.Table.from_pylist([dict(zip(COLUMNS, r)) for r in rows], schema))
+                n += len(rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return n
+
+# -------------------------------
+# Compaction
+# -------------------------------
+def compact_history(store, before, segment_size=50000, log=print):
+    # Archives the oldest records with timestamp < before. Records are
+    # appended in time order, so that is a prefix of the store: segments
+    # are written first, then the prefix is dropped in one step. A crash
+    # in between is finished on the next run via manifest["pending"].
+    from rollups import load_rollups
+    directory = archive_dir(store)
+    if directory is None:
+        raise ValueError("set HISTORY_ARCHIVE_DIR to a directory all workers can read to compact a shared store")
+    os.makedirs(directory, exist_ok=True)
+    with file_lock(_manifest_path(directory)):
+        manifest = read_manifest(directory)
+        pending = manifest.get("pending")
+        if pending:
+            head = next(iter(store.iter_records()), None)
+            if head and head.get("id") == pending["first_id"]:
+                store.drop_head(pending["count"])
+                log(f"Finished an interrupted compaction of {pending['count']} records")
+            manifest["pending"] = None
+            _write_json(_manifest_path(directory), manifest)
+        load_rollups(store)  # make sure rollups cover everything before it leaves the store
+        archived, first_id, buf = 0, None, []
+        for rec in store.iter_records():
+            if str(rec.get("timestamp") or "") >= before:
+                break
+            if first_id is None:
+                first_id = rec.get("id")
+            buf.append(rec)
+            if len(buf) >= segment_size:
+                manifest["segments"].append(write_segment(directory, buf))
+                archived, buf = archived + len(buf), []
+                manifest["pending"] = {"first_id": first_id, "count": archived}
+                _write_json(_manifest_path(directory), manifest)
+        if buf:
+            manifest["segments"].append(write_segment(directory, buf))
+            archived += len(buf)
+            manifest["pending"] = {"first_id": first_id, "count": archived}
+            _write_json(_manifest_path(directory), manifest)
+        if archived:
+            store.drop_head(archived)
+            manifest["pending"] = None
+            _write_json(_manifest_path(directory), manifest)
+        log(f"Archived {archived} records older than {before} into {directory}")
+        return archived
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Export history or archive old attempts.")
+    p.add_argument("--backend", default=HISTORY_BACKEND, choices=sorted(BACKENDS))
+    p.add_argument("--history", help="history store path (default: the backend's default)")
+    sub = p.add_subparsers(dest="command", required=True)
+    ex = sub.add_parser("export", help="stream history to CSV, JSONL or Parquet")
+    ex.add_argument("-o", "--output", default="-", help="output file (default: stdout; not for parquet)")
+    ex.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="default: from the output extension, else csv")
+    ex.add_argument("--section")
+    ex.add_argument("--start", help="first day, YYYY-MM-DD")
+    ex.add_argument("--end", help="last day, YYYY-MM-DD (inclusive)")
+    ex.add_argument("--no-archive", action="store_true", help="only the hot store")
+    co = sub.add_parser("compact", help="move old attempts into compressed archive segments")
+    when = co.add_mutually_exclusive_group(required=True)
+    when.add_argument("--older-than-days", type=int)
+    when.add_argument("--before", help="archive attempts before this day, YYYY-MM-DD")
+    co.add_argument("--segment-size", type=int, default=50000)
+    args = p.parse_args(argv)
+    store = get_history_store(args.backend, args.history)
+    log = lambda msg: print(msg, file=sys.stderr)
+
+    if args.command == "compact":
+        before = args.before or (datetime.utcnow() - timedelta(days=args.older_than_days)).date().isoformat()
+        try:
+            compact_history(store, before, args.segment_size, log)
+        except ValueError as e:
+            p.error(str(e))
+        return
+
+    fmt = args.format or {".jsonl": "jsonl", ".parquet": "parquet"}.get(os.path.splitext(args.output)[1], "csv")
+    records = iter_history(
+        store, args.section, args.start,
+        args.end + "T23:59:59.999999" if args.end else None,
+        archived=not args.no_archive,
+    )
+    if fmt == "parquet":
+        if args.output == "-":
+            p.error("parquet export needs --output")
+        n = export_history(records, args.output, fmt)
+    elif args.output == "-":
+        n = export_history(records, sys.stdout, fmt)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            n = export_history(records, f, fmt)
+    log(f"Exported {n} records")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+# history_store.py
+import bisect, json, os, shutil, sqlite3, threading, uuid
+from contextlib import contextmanager
+
+from shared_store import SHARED_STORE_URL, get_shared_store
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a process-local lock only
+    fcntl = None
+
+# -------------------------------
+# Config
+# -------------------------------
+LEGACY_HISTORY_FILE = "history.json"
+HISTORY_BACKEND = os.environ.get("HISTORY_BACKEND", "shared" if SHARED_STORE_URL else "jsonl")  # jsonl | sqlite | json | shared
+HISTORY_PATHS = {
+    "jsonl": "history.jsonl",
+    "sqlite": "history.db",
+    "json": LEGACY_HISTORY_FILE,
+    "shared": SHARED_STORE_URL,
+}
+
+_thread_lock = threading.RLock()
+
+@contextmanager
+def file_lock(path):
+    # Advisory lock on a sidecar file so writers in other Streamlit
+    # sessions / processes serialize their appends.
+    with _thread_lock, open(path + ".lock", "a") as lf:
+        if fcntl:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+# -------------------------------
+# Legacy backend: whole-file JSON list
+# -------------------------------
+class JsonHistoryStore:
+    def __init__(self, path=LEGACY_HISTORY_FILE):
+        self.path = path
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def append(self, rec):
+        self.append_many([rec])
+
+    def append_many(self, recs):
+        with file_lock(self.path):
+            data = self._read()
+            data.extend(recs)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, default=str)
+            os.replace(tmp, self.path)
+
+    def iter_records(self):
+        return iter(self._read())
+
+    def load_all(self):
+        return self._read()
+
+    def drop_head(self, n):
+        # Remove the n oldest records (after archiving them).
+        with file_lock(self.path):
+            data = self._read()[n:]
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, default=str)
+            os.replace(tmp, self.path)
+
+    def read_since(self, cursor=None):
+        # Whole-file format: any change means a full reload.
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return [], None, cursor is not None
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == cursor:
+            return [], cursor, False
+        return list(enumerate(self._read())), stamp, True
+
+    def get(self, locator):
+        return self._read()[locator]
+
+    def count(self):
+        return len(self._read())
+
+# -------------------------------
+# Append-only backend: JSON Lines
+# -------------------------------
+class JsonlHistoryStore:
+    def __init__(self, path=HISTORY_PATHS["jsonl"]):
+        self.path = path
+
+    def append(self, rec):
+        self.append_many([rec])
+
+    def append_many(self, recs):
+        if not recs:
+            return
+        payload = "".join(json.dumps(r, default=str) + "\n" for r in recs).encode("utf-8")
+        with file_lock(self.path):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def iter_records(self):
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written tail
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def load_all(self):
+        return list(self.iter_records())
+
+    def drop_head(self, n):
+        # Copies the tail to a new file; readers see the inode change and reload.
+        with file_lock(self.path):
+            tmp = self.path + ".tmp"
+            with open(self.path, "rb") as src, open(tmp, "wb") as dst:
+                dropped = 0
+                while dropped < n:
+                    line = src.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        dropped += 1
+                shutil.copyfileobj(src, dst, 1 << 20)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp, self.path)
+
+    def read_since(self, cursor=None):
+        # Returns ([(locator, record)], cursor, reset); locator = byte offset.
+        # cursor = (inode, byte offset of the first unread line)
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return [], None, cursor is not None
+        ino, offset = cursor or (st.st_ino, 0)
+        reset = False
+        if ino != st.st_ino or st.st_size < offset:
+            ino, offset, reset = st.st_ino, 0, True  # file replaced or truncated
+        recs = []
+        if st.st_size > offset:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    start, offset = offset, offset + len(line)
+                    line = line.strip()
+                    if line:
+                        recs.append((start, json.loads(line)))
+        return recs, (ino, offset), reset
+
+    def get(self, locator):
+        with open(self.path, "rb") as f:
+            f.seek(locator)
+            return json.loads(f.readline())
+
+    def count(self):
+        try:
+            with open(self.path, "rb") as f:
+                return sum(1 for line in f if line.strip())
+        except OSError:
+            return 0
+
+# -------------------------------
+# Append-only backend: SQLite (WAL)
+# -------------------------------
+class SqliteHistoryStore:
+    def __init__(self, path=HISTORY_PATHS["sqlite"]):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " id TEXT UNIQUE, section TEXT, timestamp TEXT,"
+                " score REAL, record TEXT)"
+            )
+
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def append(self, rec):
+        self.append_many([rec])
+
+    def append_many(self, recs):
+        rows = [
+            (r.get("id"), r.get("section"), r.get("timestamp"), r.get("score"), json.dumps(r, default=str))
+            for r in recs
+        ]
+        with self._conn() as con:
+            con.executemany(
+                "INSERT OR IGNORE INTO history (id, section, timestamp, score, record) VALUES (?,?,?,?,?)",
+                rows,
+            )
+
+    def iter_records(self):
+        for (record,) in self._conn().execute("SELECT record FROM history ORDER BY seq"):
+            yield json.loads(record)
+
+    def load_all(self):
+        return list(self.iter_records())
+
+    def drop_head(self, n):
+        with self._conn() as con:
+            con.execute("DELETE FROM history WHERE seq IN (SELECT seq FROM history ORDER BY seq LIMIT ?)", (n,))
+
+    def read_since(self, cursor=None):
+        # cursor = (first seq when last read, last seen seq); a changed first
+        # seq means the head was compacted away.
+        con = self._conn()
+        first, last = cursor or (None, 0)
+        head = con.execute("SELECT MIN(seq) FROM history").fetchone()[0]
+        reset = False
+        if last and head != first:
+            last, reset = 0, True
+        rows = con.execute("SELECT seq, record FROM history WHERE seq > ? ORDER BY seq", (last,)).fetchall()
+        if rows:
+            last = rows[-1][0]
+        return [(seq, json.loads(r)) for seq, r in rows], (head, last), reset
+
+    def get(self, locator):
+        row = self._conn().execute("SELECT record FROM history WHERE seq = ?", (locator,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+# -------------------------------
+# Append-only backend: shared store (see shared_store.py)
+# -------------------------------
+class SharedHistoryStore:
+    KEY = "history"
+    EPOCH_KEY = "history:epoch"  # bumped when the head is compacted away
+
+    def __init__(self, url=SHARED_STORE_URL):
+        # Takes a store URL, or a plain path like the other backends
+        # (--history X), meaning the SQLite stand-in at that path.
+        if url and "://" not in url:
+            url = f"sqlite:///{url}"
+        self.kv = get_shared_store(url)
+
+    def append(self, rec):
+        self.append_many([rec])
+
+    def append_many(self, recs):
+        if recs:
+            self.kv.rpush(self.KEY, *(json.dumps(r, default=str) for r in recs))
+
+    def iter_records(self, chunk=1000):
+        start = 0
+        while True:
+            rows = self.kv.lrange(self.KEY, start, start + chunk - 1)
+            for row in rows:
+                yield json.loads(row)
+            if len(rows) < chunk:
+                return
+            start += chunk
+
+    def load_all(self):
+        return list(self.iter_records())
+
+    def drop_head(self, n):
+        self.kv.ltrim(self.KEY, n, -1)
+        self.kv.set(self.EPOCH_KEY, str(uuid.uuid4()))
+
+    def read_since(self, cursor=None):
+        # cursor = (epoch, list length already read); locator = list index
+        epoch = self.kv.get(self.EPOCH_KEY)
+        seen, start = cursor or (epoch, 0)
+        n = self.kv.llen(self.KEY)
+        reset = n < start or seen != epoch
+        if reset:
+            start = 0
+        rows = self.kv.lrange(self.KEY, start, n - 1) if n > start else []
+        return [(start + i, json.loads(r)) for i, r in enumerate(rows)], (epoch, start + len(rows)), reset
+
+    def get(self, locator):
+        row = self.kv.lindex(self.KEY, locator)
+        return json.loads(row) if row else None
+
+    def count(self):
+        return self.kv.llen(self.KEY)
+
+BACKENDS = {
+    "jsonl": JsonlHistoryStore,
+    "sqlite": SqliteHistoryStore,
+    "json": JsonHistoryStore,
+    "shared": SharedHistoryStore,
+}
+
+# -------------------------------
+# Shared read cache
+# -------------------------------
+SUMMARY_FIELDS = ("id", "section", "difficulty", "timestamp", "score")
+
+class HistoryCache:
+    # Shared across sessions: parses only records appended since the last
+    # refresh and builds the DataFrame at most once per change. Only summary
+    # fields stay resident; details are read from the store on demand.
+    def __init__(self, store):
+        self.store = store
+        self.version = 0
+        self._cursor = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.records = []
+        self._locators = []
+        self._timestamps = []
+        self._by_section = {}  # section -> (positions, timestamps)
+        self._frame = None
+        self._frame_rows = 0
+
+    def refresh(self):
+        with self._lock:
+            recs, self._cursor, reset = self.store.read_since(self._cursor)
+            if reset:
+                self._reset()
+            for locator, rec in recs:
+                pos = len(self.records)
+                summary = {k: rec.get(k) for k in SUMMARY_FIELDS}
+                summary["section"] = summary["section"] or "Unknown"  # as in rollups
+                ts = str(summary["timestamp"] or "")
+                self.records.append(summary)
+                self._locators.append(locator)
+                self._timestamps.append(ts)
+                positions, stamps = self._by_section.setdefault(summary["section"], ([], []))
+                positions.append(pos)
+                stamps.append(ts)
+            if recs or reset:
+                self.version += 1
+        return self
+
+    def sections(self):
+        with self._lock:
+            return list(self._by_section)
+
+    def query(self, section=None, start=None, end=None, min_score=None, max_score=None, offset=0, limit=20):
+        # Newest first. Records are appended in time order, so the
+        # timestamp lists are sorted and a date range is two bisects.
+        # Other sessions refresh() concurrently, hence the lock.
+        with self._lock:
+            return self._query(section, start, end, min_score, max_score, offset, limit)
+
+    def _query(self, section, start, end, min_score, max_score, offset, limit):
+        if section:
+            positions, stamps = self._by_section.get(section, ([], []))
+        else:
+            positions, stamps = range(len(self._timestamps)), self._timestamps
+        lo = bisect.bisect_left(stamps, start) if start else 0
+        hi = bisect.bisect_right(stamps, end) if end else len(stamps)
+        window = positions[lo:hi]
+        if min_score is None and max_score is None:
+            total = len(window)
+            page = window[max(total - offset - limit, 0):max(total - offset, 0)][::-1]
+        else:
+            matches = [
+                pos for pos in reversed(window)
+                if (min_score is None or (self.records[pos]["score"] or 0) >= min_score)
+                and (max_score is None or (self.records[pos]["score"] or 0) <= max_score)
+            ]
+            total, page = len(matches), matches[offset:offset + limit]
+        return total, [dict(self.records[pos], pos=pos) for pos in page]
+
+    def details(self, pos):
+        with self._lock:
+            locator = self._locators[pos]
+        rec = self.store.get(locator) or {}
+        return rec.get("details", [])
+
+    def frame(self):
+        import pandas as pd
+        with self._lock:
+            records = self.records
+            if self._frame is None:
+                self._frame = pd.DataFrame(records)
+            elif self._frame_rows < len(records):
+                new = pd.DataFrame(records[self._frame_rows:])
+                self._frame = pd.concat([self._frame, new], ignore_index=True)
+            self._frame_rows = len(records)
+            return self._frame
+
+# -------------------------------
+# Migration from history.json
+# -------------------------------
+def migrate_json_history(store, src=LEGACY_HISTORY_FILE):
+    if isinstance(store, JsonHistoryStore) or not os.path.exists(src):
+        return 0
+    with file_lock(src):
+        if store.count():
+            return 0  # already migrated (or store in use)
+        try:
+            with open(src, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, list):
+            return 0
+        store.append_many(data)
+        return len(data)
+
+_store = None
+
+def get_history_store(backend=None, path=None):
+    global _store
+    if backend is None and path is None and _store is not None:
+        return _store
+    backend = backend or HISTORY_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown history backend: {backend}")
+    store = BACKENDS[backend](path or HISTORY_PATHS[backend])
+    migrate_json_history(store)
+    if path is None:
+        _store = store
+    return store
@@ -0,0 +1,248 @@
+# ingest_bank.py
+"""Validate, deduplicate and compile question bank files.
+
+    python ingest_bank.py questions.jsonl more.csv [-o question_bank.qbk] [--report rejects.jsonl]
+
+Inputs are JSON (the nested {section: {difficulty: [...]}} bank or a list
+of records), JSONL or CSV with section, difficulty, q, a and optional
+options columns (a JSON list or "|"-separated). JSONL and CSV are streamed
+record by record; accepted questions are spooled to disk per bucket and
+written out in the compiled format load_question_bank() picks up.
+
+Every question gets a stable id (its own "id" field, or a hash of section
+and normalized text). Exact duplicates are dropped on that text; near
+duplicates are found with MinHash signatures over word shingles and an LSH
+band index, so each question is only compared with its few candidates.
+Rejected records and the reason go to --report, and a summary to stdout.
+"""
+import argparse, csv, json, os, random, sys, tempfile, zlib
+from array import array
+
+from question_bank import CHOICE_SECTIONS, COMPILED_BANK_FILE, normalize, stable_id, write_compiled
+
+MERSENNE = (1 << 61) - 1
+
+# -------------------------------
+# Readers
+# -------------------------------
+def _detect(path, fmt):
+    if fmt != "auto":
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}.get(ext, "json")
+
+def read_records(path, fmt="auto"):
+    # Yields (location, record) so validation errors can point at the input.
+    fmt = _detect(path, fmt)
+    if fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield f"{path}:{n}", json.loads(line)
+                    except ValueError as e:
+                        yield f"{path}:{n}", ValueError(f"invalid JSON: {e}")
+    elif fmt == "csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for n, row in enumerate(csv.DictReader(f), 2):
+                opts = (row.get("options") or "").strip()
+                if opts.startswith("["):
+                    try:
+                        row["options"] = json.loads(opts)
+                    except ValueError as e:
+                        yield f"{path}:{n}", ValueError(f"invalid options: {e}")
+                        continue
+                else:
+                    row["options"] = [o.strip() for o in opts.split("|")] if opts else None
+                yield f"{path}:{n}", row
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            for section, diffs in data.items():
+                for diff, qs in diffs.items():
+                    for i, q in enumerate(qs):
+                        yield f"{path}:{section}/{diff}/{i}", dict(q, section=section, difficulty=diff)
+        else:
+            for i, rec in enumerate(data):
+                yield f"{path}:[{i}]", rec
+
+# -------------------------------
+# Validation
+# -------------------------------
+def validate(rec):
+    # Returns the cleaned question or raises ValueError.
+    if not isinstance(rec, dict):
+        raise ValueError("record is not an object")
+    section = str(rec.get("section") or "").strip()
+    diff = str(rec.get("difficulty") or "").strip()
+    q = str(rec.get("q") or rec.get("question") or "").strip()
+    a = str(rec.get("a") or rec.get("answer") or "").strip()
+    options = rec.get("options") or None
+    if not section or not diff:
+        raise ValueError("missing section or difficulty")
+    if not q:
+        raise ValueError("missing question text")
+    if not a:
+        raise ValueError("missing answer")
+    if options is not None:
+        if not isinstance(options, list) or not all(isinstance(o, str) for o in options):
+            raise ValueError("options must be a list of strings")
+        options = [o.strip() for o in options]
+    if section in CHOICE_SECTIONS:
+        # Open sections are graded on the text, so their options (if any)
+        # are only hints; choice sections are graded by exact match.
+        if options is None or len(set(options)) < 2:
+            raise ValueError(f"{section} questions need at least two distinct options")
+        if a not in options:
+            raise ValueError(f"answer {a!r} is not one of the options")
+    out = {"id": str(rec.get("id") or stable_id(section, q)), "q": q, "a": a}
+    if options is not None:
+        out["options"] = options
+    return section, diff, out
+
+# -------------------------------
+# Near-duplicate detection (MinHash + LSH)
+# -------------------------------
+class NearDuplicateIndex:
+    # num_perm = bands * rows. Two questions with Jaccard similarity s share
+    # a band with probability 1 - (1 - s^rows)^bands; candidates are then
+    # checked against the signature estimate, so there are no false positives
+    # beyond MinHash error.
+    def __init__(self, threshold=0.8, num_perm=64, shingle=3, seed=1):
+        self.threshold = threshold
+        self.bands, self.rows = self._bands(threshold, num_perm)
+        self.shingle = shingle
+        rng = random.Random(seed)
+        self.perms = [(rng.randrange(1, MERSENNE), rng.randrange(MERSENNE)) for _ in range(num_perm)]
+        self.signatures = array("I")  # num_perm entries per indexed question
+        self.ids = []
+        self.buckets = {}
+
+    @staticmethod
+    def _bands(threshold, num_perm):
+        # The band layout whose S-curve midpoint (1/b)^(1/r) sits a little
+        # below the threshold, trading extra candidates for recall.
+        layouts = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+        below = [(b, r) for b, r in layouts if (1 / b) ** (1 / r) <= 0.9 * threshold]
+        return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1])) if below else layouts[0]
+
+    def signature(self, text):
+        words = normalize(text).split()
+        n = self.shingle
+        grams = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+        hashes = [zlib.crc32(g.encode("utf-8")) for g in grams]
+        return array("I", (min((a * h + b) % MERSENNE for h in hashes) & 0xFFFFFFFF for a, b in self.perms))
+
+    def _similarity(self, sig, pos):
+        k = len(self.perms)
+        other = self.signatures[pos * k:(pos + 1) * k]
+        return sum(x == y for x, y in zip(sig, other)) / k
+
+    def add(self, key, qid, text):
+        # Returns (id, similarity) of the best earlier match, or None and
+        # indexes the question.
+        sig = self.signature(text)
+        keys = [
+            hash((key, band, sig[band * self.rows:(band + 1) * self.rows].tobytes()))
+            for band in range(self.bands)
+        ]
+        best = None
+        for pos in {p for k in keys for p in self.buckets.get(k, ())}:
+            sim = self._similarity(sig, pos)
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (self.ids[pos], sim)
+        if best:
+            return best
+        pos = len(self.ids)
+        self.ids.append(qid)
+        self.signatures.extend(sig)
+        for k in keys:
+            self.buckets.setdefault(k, []).append(pos)
+        return None
+
+# -------------------------------
+# Pipeline
+# -------------------------------
+def ingest(sources, output=COMPILED_BANK_FILE, fmt="auto", threshold=0.8, drop_near=True, report=None, log=print):
+    stats = {"read": 0, "accepted": 0, "invalid": 0, "exact_duplicates": 0, "near_duplicates": 0}
+    seen, index = {}, NearDuplicateIndex(threshold)
+    rejects = open(report, "w", encoding="utf-8") if report else None
+
+    def reject(kind, where, reason, **extra):
+        stats[kind] += 1
+        if rejects:
+            rejects.write(json.dumps(dict({"where": where, "kind": kind, "reason": reason}, **extra), ensure_ascii=False) + "\n")
+
+    spool_dir = tempfile.mkdtemp(prefix="ingest-", dir=os.path.dirname(os.path.abspath(output)))
+    spools, order = {}, {}
+    try:
+        for path in sources:
+            for where, rec in read_records(path, fmt):
+                stats["read"] += 1
+                if isinstance(rec, Exception):
+                    reject("invalid", where, str(rec))
+                    continue
+                try:
+                    section, diff, q = validate(rec)
+                except ValueError as e:
+                    reject("invalid", where, str(e))
+                    continue
+                text_key = stable_id(section, q["q"])
+                if text_key in seen or q["id"] in seen:
+                    reject("exact_duplicates", where, "duplicate question", id=q["id"], duplicate_of=seen.get(text_key) or seen[q["id"]])
+                    continue
+                seen[text_key] = seen[q["id"]] = q["id"]
+                match = index.add(section, q["id"], q["q"])
+                if match:
+                    reject("near_duplicates", where, "near-duplicate question", id=q["id"], duplicate_of=match[0], similarity=round(match[1], 3))
+                    if drop_near:
+                        continue
+                if (section, diff) not in spools:
+                    spools[section, diff] = open(os.path.join(spool_dir, f"{len(spools)}.jsonl"), "w+", encoding="utf-8")
+                    order.setdefault(section, []).append(diff)
+                spools[section, diff].write(json.dumps(q, ensure_ascii=False) + "\n")
+                stats["accepted"] += 1
+                if stats["read"] % 100000 == 0:
+                    log(f"{stats['read']} read, {stats['accepted']} accepted")
+
+        def replay(f):
+            f.seek(0)
+            for line in f:
+                yield json.loads(line)
+
+        stats["written"] = write_compiled(
+            {section: {diff: replay(spools[section, diff]) for diff in diffs} for section, diffs in order.items()},
+            output,
+        )
+    finally:
+        for f in spools.values():
+            f.close()
+        for name in os.listdir(spool_dir):
+            os.remove(os.path.join(spool_dir, name))
+        os.rmdir(spool_dir)
+        if rejects:
+            rejects.close()
+    return stats
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Validate, deduplicate and compile question bank files.")
+    p.add_argument("sources", nargs="+", help="JSON, JSONL or CSV files")
+    p.add_argument("-o", "--output", default=COMPILED_BANK_FILE)
+    p.add_argument("--format", default="auto", choices=["auto", "json", "jsonl", "csv"])
+    p.add_argument("--near-threshold", type=float, default=0.8, help="MinHash Jaccard estimate for near duplicates")
+    p.add_argument("--keep-near-duplicates", action="store_true", help="report near duplicates but keep them")
+    p.add_argument("--report", help="write rejected records as JSON lines here")
+    p.add_argument("--strict", action="store_true", help="exit non-zero if any record is invalid")
+    args = p.parse_args(argv)
+    log = lambda msg: print(msg, file=sys.stderr)
+    stats = ingest(
+        args.sources, args.output, args.format, args.near_threshold,
+        drop_near=not args.keep_near_duplicates, report=args.report, log=log,
+    )
+    print(json.dumps(stats))
+    if args.strict and stats["invalid"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# profiling.py
+import json, os, sys, threading, time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+DEBUG_PANEL = os.environ.get("DEBUG_PANEL", "") not in ("", "0")
+METRICS_FILE = os.environ.get("METRICS_FILE")  # per-rerun JSON lines when set
+METRICS_DUMP_SECONDS = 60  # how often the aggregate rows are appended too
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+# -------------------------------
+# Process-wide metrics
+# -------------------------------
+class Metrics:
+    # Per-stage counter plus a fixed-bucket latency histogram.
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._dumped = time.monotonic()
+
+    def observe(self, stage, ms):
+        with self._lock:
+            s = self.stages.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * len(BUCKETS_MS)})
+            s["count"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["buckets"][next(i for i, b in enumerate(BUCKETS_MS) if ms <= b)] += 1
+
+    def _quantile(self, s, q):
+        target, seen = q * s["count"], 0
+        for bound, n in zip(BUCKETS_MS, s["buckets"]):
+            seen += n
+            if seen >= target:
+                return min(bound, s["max_ms"])
+        return s["max_ms"]
+
+    def rows(self, buckets=False):
+        # buckets=True adds the histogram as [upper bound ms, count] pairs
+        # (the last bound is "+Inf", which JSON can carry).
+        with self._lock:
+            rows = []
+            for stage, s in sorted(self.stages.items()):
+                row = {
+                    "stage": stage, "count": s["count"],
+                    "mean_ms": round(s["total_ms"] / s["count"], 2),
+                    "p50_ms": round(self._quantile(s, 0.5), 2),
+                    "p95_ms": round(self._quantile(s, 0.95), 2),
+                    "max_ms": round(s["max_ms"], 2),
+                }
+                if buckets:
+                    row["buckets"] = [
+                        ["+Inf" if b == float("inf") else b, n] for b, n in zip(BUCKETS_MS, s["buckets"])
+                    ]
+                rows.append(row)
+            return rows
+
+    def due(self, every=METRICS_DUMP_SECONDS):
+        # True at most once per `every` seconds across threads.
+        with self._lock:
+            now = time.monotonic()
+            if now - self._dumped < every:
+                return False
+            self._dumped = now
+            return True
+
+metrics = Metrics()
+
+# -------------------------------
+# Per-rerun spans
+# -------------------------------
+class Rerun:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.finished = False
+
+    @contextmanager
+    def span(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.spans.append((name, round(ms, 3)))
+            metrics.observe(name, ms)
+
+    def finish(self, session=None, path=METRICS_FILE):
+        if self.finished:
+            return
+        self.finished = True
+        total = (time.perf_counter() - self.started) * 1000
+        metrics.observe("rerun", total)
+        if path:
+            ts = datetime.utcnow().isoformat()
+            lines = [json.dumps({
+                "kind": "rerun", "ts": ts, "session": session,
+                "total_ms": round(total, 3), "spans": self.spans,
+            })]
+            if metrics.due():
+                # Process-wide counters and histograms, so they survive a restart.
+                rows = metrics.rows(buckets=True)
+                lines.append(json.dumps({"kind": "metrics", "ts": ts, "pid": os.getpid(), "rows": rows}))
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
+
+# -------------------------------
+# Sampling profiler
+# -------------------------------
+class SamplingProfiler:
+    # Samples one thread's stack from a background thread every `interval`
+    # seconds, so the profiled code runs at full speed between samples.
+    def __init__(self, interval=0.005, max_seconds=60):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        target = thread_id or threading.get_ident()
+        self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self, target):
+        deadline = time.monotonic() + self.max_seconds  # never outlive a forgotten stop()
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(target)
+            self.counts["(all samples)"] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                if key not in seen:  # count recursive frames once
+                    self.counts[key] += 1
+                    seen.add(key)
+                frame = frame.f_back
+
+    def stop(self, into=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if into is not None:
+            into.update(self.counts)
+            return into
+        return self.counts
@@ -0,0 +1,155 @@
+# regrade.py
+"""Re-grade every stored attempt with the current scoring logic.
+
+    python regrade.py [--output history.regraded.jsonl] [--workers N]
+
+Records are streamed from the history store, graded in chunks across a
+process pool and appended in input order to the output file. Re-running
+the same command resumes after the last complete record written.
+"""
+import argparse, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from history_store import get_history_store, BACKENDS, HISTORY_BACKEND
+from question_bank import CompiledBank, DictBank, load_question_bank
+from scoring import SCORER, SCORERS, OPEN_SECTIONS, CHOICE_SECTIONS, grade_attempts, make_scorer
+
+DEFAULT_OUTPUT = "history.regraded.jsonl"
+
+# -------------------------------
+# Worker
+# -------------------------------
+_engine = None
+_questions = None
+
+def _load_bank(bank_path):
+    # An explicit --bank wins over the compiled bank load_question_bank() prefers.
+    if bank_path is None:
+        return load_question_bank()
+    if bank_path.endswith(".qbk"):
+        return CompiledBank(bank_path)
+    with open(bank_path, "r", encoding="utf-8") as f:
+        return DictBank(json.load(f))
+
+def _init_worker(bank_path, scorer):
+    global _engine, _questions
+    bank = _load_bank(bank_path)
+    _engine = make_scorer(bank, scorer)
+    _questions = {(section, q["q"]): q for section, _, q in bank.iter_questions()}
+
+def _attempt(rec):
+    # Rebuild (section, qs, answers) from stored details; None when the
+    # record predates answers being stored or references unknown questions.
+    section = rec.get("section")
+    key = "answer" if section in OPEN_SECTIONS else "selected" if section in CHOICE_SECTIONS else None
+    details = rec.get("details") or []
+    if key is None or not details:
+        return None
+    qs, answers = [], []
+    for d in details:
+        q = _questions.get((section, d.get("q")))
+        if q is None or key not in d:
+            return None
+        qs.append(q)
+        answers.append(d[key])
+    return section, qs, answers
+
+def regrade_chunk(recs):
+    attempts = [_attempt(r) for r in recs]
+    graded = iter(grade_attempts(_engine, [a for a in attempts if a is not None]))
+    stamp = datetime.utcnow().isoformat()
+    out, skipped = [], 0
+    for rec, attempt in zip(recs, attempts):
+        if attempt is None:
+            out.append(rec)
+            skipped += 1
+            continue
+        avg, details = next(graded)
+        out.append(dict(
+            rec,
+            score=round(float(avg), 2),
+            details=details,
+            previous_score=rec.get("score"),
+            regraded_at=stamp,
+        ))
+    return out, skipped
+
+# -------------------------------
+# Driver
+# -------------------------------
+def _resume_point(path):
+    # Drop a partially written tail and count the complete records.
+    if not os.path.exists(path):
+        return 0
+    done, good = 0, 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            good += len(line)
+            done += 1
+    with open(path, "r+b") as f:
+        f.truncate(good)
+    return done
+
+def _chunks(records, size, skip):
+    chunk = []
+    for i, rec in enumerate(records):
+        if i < skip:
+            continue
+        chunk.append(rec)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def regrade(store, output, bank_path, workers=None, chunk_size=500, scorer=None, log=print):
+    done = _resume_point(output)
+    if done:
+        log(f"Resuming after {done} records")
+    workers = workers or os.cpu_count() or 1
+    total, skipped = 0, 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(bank_path, scorer)) as pool, \
+            open(output, "a", encoding="utf-8") as out:
+        pending = []
+        chunks = _chunks(store.iter_records(), chunk_size, done)
+        exhausted = False
+        while pending or not exhausted:
+            # Keep a bounded window in flight so memory stays O(workers * chunk).
+            while not exhausted and len(pending) < workers * 2:
+                try:
+                    pending.append(pool.submit(regrade_chunk, next(chunks)))
+                except StopIteration:
+                    exhausted = True
+            if not pending:
+                break
+            recs, n_skipped = pending.pop(0).result()
+            out.write("".join(json.dumps(r, default=str) + "\n" for r in recs))
+            out.flush()
+            total += len(recs)
+            skipped += n_skipped
+            elapsed = time.perf_counter() - started
+            log(f"{done + total} records  {total / elapsed:,.0f} attempts/sec")
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else 0
+    log(f"Done: {total} records ({skipped} kept as-is, no stored answers) in {elapsed:.1f}s, {rate:,.0f} attempts/sec")
+    return {"records": total, "skipped": skipped, "seconds": elapsed, "rate": rate}
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Re-grade stored attempts with the current scoring logic.")
+    p.add_argument("--backend", default=HISTORY_BACKEND, choices=sorted(BACKENDS))
+    p.add_argument("--history", help="history store path (default: backend's default file)")
+    p.add_argument("--bank", help="JSON or compiled .qbk bank (default: the app's bank)")
+    p.add_argument("--output", default=DEFAULT_OUTPUT)
+    p.add_argument("--workers", type=int)
+    p.add_argument("--chunk-size", type=int, default=500)
+    p.add_argument("--scorer", default=SCORER, choices=sorted(SCORERS))
+    args = p.parse_args(argv)
+    store = get_history_store(args.backend, args.history)
+    regrade(store, args.output, args.bank, args.workers, args.chunk_size, args.scorer)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# rollups.py
+import argparse, json, math, os
+
+from history_archive import archive_dir, iter_archive
+from history_store import file_lock, get_history_store
+from shared_store import SHARED_STORE_URL, get_shared_store
+
+ROLLUPS_FILE = "history.rollups.json"
+ROLLUPS_KEY = "rollups"  # used instead of the file when SHARED_STORE_URL is set
+DIMENSIONS = ("section", "day", "difficulty")
+
+# -------------------------------
+# Aggregates
+# -------------------------------
+# Each cell is [count, sum, sum of squares, min, max] of the score.
+def _merge(cell, other):
+    if cell is None:
+        return list(other)
+    return [
+        cell[0] + other[0], cell[1] + other[1], cell[2] + other[2],
+        min(cell[3], other[3]), max(cell[4], other[4]),
+    ]
+
+def _keys(rec):
+    return {
+        "section": rec.get("section") or "Unknown",
+        "day": str(rec.get("timestamp", ""))[:10] or "Unknown",
+        "difficulty": rec.get("difficulty") or "Unknown",
+    }
+
+class Rollups:
+    def __init__(self, tables=None):
+        self.tables = tables or {dim: {} for dim in DIMENSIONS}
+
+    def add(self, rec):
+        score = float(rec.get("score") or 0)
+        cell = [1, score, score * score, score, score]
+        for dim, key in _keys(rec).items():
+            table = self.tables.setdefault(dim, {})
+            table[key] = _merge(table.get(key), cell)
+
+    def rows(self, dim):
+        out = []
+        for key, (n, total, sq, lo, hi) in sorted(self.tables.get(dim, {}).items()):
+            mean = total / n
+            out.append({
+                dim: key, "count": n, "mean": round(mean, 2),
+                "std": round(math.sqrt(max(sq / n - mean * mean, 0)), 2),
+                "min": lo, "max": hi,
+            })
+        return out
+
+    def total(self):
+        return sum(cell[0] for cell in self.tables.get("section", {}).values())
+
+def downsample(rows, dim, max_points=120):
+    # Merge consecutive rows (e.g. days) so a chart never ships more than
+    # max_points bars/points, whatever the history length.
+    if len(rows) <= max_points:
+        return rows
+    step = math.ceil(len(rows) / max_points)
+    out = []
+    for i in range(0, len(rows), step):
+        chunk = rows[i:i + step]
+        n = sum(r["count"] for r in chunk)
+        out.append({
+            dim: chunk[0][dim], "count": n,
+            "mean": round(sum(r["mean"] * r["count"] for r in chunk) / n, 2),
+            "min": min(r["min"] for r in chunk), "max": max(r["max"] for r in chunk),
+        })
+    return out
+
+# -------------------------------
+# Persistence
+# -------------------------------
+_cache = {}
+
+def _shared(path):
+    return SHARED_STORE_URL and path == ROLLUPS_FILE
+
+def _lock(path):
+    return get_shared_store().lock(ROLLUPS_KEY) if _shared(path) else file_lock(path)
+
+def _read_shared():
+    raw = get_shared_store().get(ROLLUPS_KEY)
+    if raw is None:
+        return None
+    hit = _cache.get(ROLLUPS_KEY)
+    if hit and hit[0] == raw:
+        return hit[1]
+    rollups = Rollups(json.loads(raw))
+    _cache[ROLLUPS_KEY] = (raw, rollups)
+    return rollups
+
+def _read(path):
+    if _shared(path):
+        return _read_shared()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _cache.get(path)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rollups = Rollups(json.load(f))
+    except (OSError, ValueError):
+        return None
+    _cache[path] = (stamp, rollups)
+    return rollups
+
+def _write(rollups, path):
+    if _shared(path):
+        get_shared_store().set(ROLLUPS_KEY, json.dumps(rollups.tables))
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(rollups.tables, f)
+    os.replace(tmp, path)
+
+def _rebuild(store, path):
+    # Compacted attempts only live in the archive, so it counts too.
+    rollups = Rollups()
+    for rec in iter_archive(archive_dir(store)):
+        rollups.add(rec)
+    for rec in store.iter_records():
+        rollups.add(rec)
+    _write(rollups, path)
+    return rollups
+
+def rebuild_rollups(store, path=ROLLUPS_FILE):
+    with _lock(path):
+        return _rebuild(store, path)
+
+def load_rollups(store=None, path=ROLLUPS_FILE):
+    rollups = _read(path)
+    if rollups is None:
+        rollups = rebuild_rollups(store or get_history_store(), path)
+    return rollups
+
+def update_rollups(recs, store=None, path=ROLLUPS_FILE):
+    # Call after recs have been appended to the store: a missing rollups
+    # file is rebuilt from the store, which already includes them.
+    with _lock(path):
+        cached = _read(path)
+        if cached is None:
+            _rebuild(store or get_history_store(), path)
+            return
+        rollups = Rollups({dim: dict(table) for dim, table in cached.tables.items()})
+        for rec in recs:
+            rollups.add(rec)
+        _write(rollups, path)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Rebuild history rollups from the history store.")
+    p.add_argument("--output", default=ROLLUPS_FILE)
+    args = p.parse_args(argv)
+    rollups = rebuild_rollups(get_history_store(), args.output)
+    print(f"Rolled up {rollups.total()} records into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# sampling.py
+import random
+from collections import OrderedDict
+
+# -------------------------------
+# Per-user seen set
+# -------------------------------
+class SeenSet:
+    # Bitset over qids for O(1) membership, plus a recency queue so only
+    # the `capacity` most recently served questions count as seen.
+    def __init__(self, size, capacity=200):
+        self.bits = bytearray((size + 7) // 8)
+        self.recent = OrderedDict()  # qid -> None, oldest first
+        self.capacity = capacity
+
+    def __contains__(self, qid):
+        byte = qid >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (qid & 7)))
+
+    def add(self, qid):
+        if qid in self:
+            self.recent.move_to_end(qid)  # served again: now the most recent
+            return
+        byte = qid >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        self.bits[byte] |= 1 << (qid & 7)
+        self.recent[qid] = None
+        if len(self.recent) > self.capacity:
+            old, _ = self.recent.popitem(last=False)
+            self.bits[old >> 3] &= ~(1 << (old & 7))
+
+    def update(self, qids):
+        for qid in qids:
+            self.add(qid)
+
+# -------------------------------
+# Sampling
+# -------------------------------
+def sample_questions(ids, k, rng=None, seen=None):
+    # Draw up to k distinct qids from an indexable pool (e.g. a bank range)
+    # in O(k), preferring ones not in `seen`.
+    rng = rng or random
+    n = len(ids)
+    k = min(k, n)
+    if not seen:
+        return [ids[i] for i in rng.sample(range(n), k)]
+    picked, repeats, tried = [], [], set()
+    budget = 4 * k + 32
+    while len(picked) < k and len(tried) < n and budget:
+        budget -= 1
+        i = rng.randrange(n)
+        if i in tried:
+            continue
+        tried.add(i)
+        (repeats if ids[i] in seen else picked).append(ids[i])
+    if len(picked) < k:
+        # Mostly-seen pool: top up with repeats, then any untried questions.
+        picked.extend(repeats[:k - len(picked)])
+    if len(picked) < k:
+        rest = [i for i in range(n) if i not in tried]
+        picked.extend(ids[i] for i in rng.sample(rest, k - len(picked)))
+    return picked
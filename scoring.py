@@ -0,0 +1,187 @@
+# scoring.py
+import math, os, re, zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from question_bank import OPEN_SECTIONS, CHOICE_SECTIONS
+SCORER = os.environ.get("SCORER", "tfidf")  # tfidf | embedding
+# Only the head of an answer is graded, so a pasted essay costs no more
+# than a long answer.
+MAX_ANSWER_CHARS = 4000
+MAX_ANSWER_TOKENS = 400
+
+def reference_answers(bank, sections=OPEN_SECTIONS):
+    refs = [q["a"] for _, _, q in bank.iter_questions(sections) if q.get("a") and q["a"].strip()]
+    return list(dict.fromkeys(refs))
+
+# -------------------------------
+# Scorer interface
+# -------------------------------
+class Scorer:
+    def similarities(self, answers, refs):
+        # Row-wise similarity (0-100) of answers[i] vs refs[i]; blank
+        # answers or references score 0.
+        out = np.zeros(len(answers))
+        idx = [
+            i for i, (a, r) in enumerate(zip(answers, refs))
+            if a and r and a.strip() and r.strip()
+        ]
+        if idx:
+            sims = self._cosines([answers[i][:MAX_ANSWER_CHARS] for i in idx], [refs[i] for i in idx])
+            out[idx] = np.round(np.clip(sims * 100, 0, 100), 2)
+        return out
+
+    def similarity(self, answer, ref):
+        return float(self.similarities([answer], [ref])[0])
+
+    def _cosines(self, answers, refs):
+        raise NotImplementedError
+
+# -------------------------------
+# TF-IDF engine
+# -------------------------------
+class TfidfScoringEngine(Scorer):
+    # IDF weights are fitted once over every open-answer reference in the
+    # bank; reference vectors are cached as {term: weight} with their norm.
+    # An answer is tokenized once and dotted against its reference in
+    # plain Python, which for a few dozen tokens beats sklearn's per-call
+    # transform overhead. Words no reference uses get the IDF of an unseen
+    # term and count towards the answer's norm, so padding an answer with
+    # unrelated text lowers its score instead of being ignored.
+    def __init__(self, bank):
+        from sklearn.feature_extraction.text import TfidfVectorizer  # slow import, only needed to fit
+        vectorizer = TfidfVectorizer()
+        self.analyze = vectorizer.build_analyzer()
+        self.idf = {}
+        refs = reference_answers(bank)
+        if refs:
+            try:
+                vectorizer.fit(refs)
+                self.idf = dict(zip(vectorizer.get_feature_names_out(), vectorizer.idf_.tolist()))
+            except ValueError:  # empty vocabulary
+                pass
+        self.oov_idf = math.log(1 + len(refs)) + 1  # smooth IDF of a term in no reference
+        self.ref_vectors = {r: self.vector(r) for r in refs} if self.idf else {}
+
+    def vector(self, text):
+        weights = Counter(self.analyze(text))
+        for term, tf in weights.items():
+            weights[term] = tf * self.idf.get(term, self.oov_idf)
+        return weights, math.sqrt(sum(w * w for w in weights.values()))
+
+    def _cosine(self, answer, ref):
+        (a, na), (r, nr) = self.vector(answer), self.ref_vectors.get(ref) or self.vector(ref)
+        if not na or not nr:
+            return 0.0
+        if len(a) > len(r):
+            a, r = r, a
+        return sum(w * r.get(term, 0.0) for term, w in a.items()) / (na * nr)
+
+    def _cosines(self, answers, refs):
+        if not self.idf:
+            return np.zeros(len(answers))
+        return np.array([self._cosine(a, r) for a, r in zip(answers, refs)])
+
+# -------------------------------
+# Hashed n-gram embedding engine
+# -------------------------------
+def normalize_text(text):
+    return " ".join(re.findall(r"\w+", text[:MAX_ANSWER_CHARS].lower())[:MAX_ANSWER_TOKENS])
+
+@lru_cache(maxsize=8192)
+def _hashed_embedding(text, dim):
+    # Signed feature hashing of word unigrams and character 3/4-grams into
+    # a dense float32 vector; keyed on normalized text so resubmissions of
+    # the same answer skip the work. crc32 keeps hashes stable across
+    # processes.
+    vec = np.zeros(dim, dtype=np.float32)
+    for word in text.split():
+        grams = [word]
+        padded = f" {word} "
+        for n in (3, 4):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        for g in grams:
+            h = zlib.crc32(g.encode("utf-8"))
+            vec[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vec)
+    if norm:
+        vec /= norm
+    vec.flags.writeable = False
+    return vec
+
+class HashedEmbeddingScorer(Scorer):
+    # CPU-only, no model download: answers that share word stems or
+    # spelling fragments with the reference score well even when phrased
+    # differently. Reference embeddings are precomputed into a float32
+    # matrix.
+    def __init__(self, bank, dim=1024):
+        self.dim = dim
+        refs = reference_answers(bank)
+        self.ref_index = {r: i for i, r in enumerate(refs)}
+        self.ref_vectors = np.stack([self.embed(r) for r in refs]) if refs else np.zeros((0, dim), dtype=np.float32)
+
+    def embed(self, text):
+        return _hashed_embedding(normalize_text(text), self.dim)
+
+    def _cosines(self, answers, refs):
+        vecs = np.stack([self.embed(a) for a in answers])
+        rows = np.stack([
+            self.ref_vectors[self.ref_index[r]] if r in self.ref_index else self.embed(r)
+            for r in refs
+        ])
+        return (vecs * rows).sum(axis=1)
+
+SCORERS = {
+    "tfidf": TfidfScoringEngine,
+    "embedding": HashedEmbeddingScorer,
+}
+
+def make_scorer(bank, name=None):
+    name = name or SCORER
+    if name not in SCORERS:
+        raise ValueError(f"Unknown scorer: {name}")
+    return SCORERS[name](bank)
+
+# -------------------------------
+# Batch grading
+# -------------------------------
+def grade_attempts(engine, attempts):
+    # attempts: iterable of (section, qs, answers). All open answers across
+    # every attempt are scored in one similarities() call.
+    attempts = list(attempts)
+    open_answers, open_refs, spans = [], [], []
+    for section, qs, answers in attempts:
+        start = len(open_answers)
+        if section in OPEN_SECTIONS:
+            open_answers.extend(answers)
+            open_refs.extend(q["a"] for q in qs)
+        spans.append((start, len(open_answers)))
+    sims = engine.similarities(open_answers, open_refs)
+
+    results = []
+    for (section, qs, answers), (start, end) in zip(attempts, spans):
+        if section in OPEN_SECTIONS:
+            scores = sims[start:end]
+            avg = float(scores.mean()) if len(scores) else 0
+            details = [
+                {"q": q["q"], "answer": a, "score": round(float(s), 2)}
+                for q, a, s in zip(qs, answers, scores)
+            ]
+        elif section in CHOICE_SECTIONS:
+            correct = np.array(answers, dtype=object) == np.array([q["a"] for q in qs], dtype=object)
+            scores = correct.astype(int)
+            avg = int(scores.sum())
+            details = [
+                {"q": q["q"], "selected": a, "correct": q["a"], "score": int(s)}
+                for q, a, s in zip(qs, answers, scores)
+            ]
+        else:
+            avg = 0
+            details = [{"q": q["q"], "score": 0} for q in qs]
+        results.append((avg, details))
+    return results
+
+def grade_exam(engine, section, qs, answers):
+    return grade_attempts(engine, [(section, qs, answers)])[0]
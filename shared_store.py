@@ -0,0 +1,208 @@
+# shared_store.py
+"""Shared state for running several Streamlit workers behind a load balancer.
+
+Set SHARED_STORE_URL on every worker to the same store:
+
+    sqlite:///shared_state.db   local stand-in; workers on one host
+    redis://host:6379/0         Redis (needs the `redis` package); any host
+
+With it set, history (backend "shared"), rollups and resumable exam
+sessions live in the store instead of per-process files, so a user may hit
+any worker on any request. Give each worker its own WORKER_ID so submission
+spools don't collide, e.g.
+
+    WORKER_ID=1 SHARED_STORE_URL=sqlite:///shared_state.db streamlit run app.py --server.port 8501
+
+Consistency model
+-----------------
+* History is an append-only list. Appends are atomic and totally ordered
+  (one RPUSH per batch), and a record is visible to every worker once its
+  append returns. Each worker's history cache sees new records on its next
+  rerun: reads are read-your-writes for the submitting worker and
+  eventually consistent (one refresh) for the others.
+* Submissions are acknowledged once spooled on the receiving worker. The
+  record reaches the shared history when that worker's background thread
+  persists it, usually within milliseconds. If a worker dies, its jobs wait
+  in its spool until a worker with the same WORKER_ID restarts.
+* Rollups are read-modify-written under a store lock. Updates are
+  serialized and never lost. A reader may see rollups that trail the
+  history by the batches still in flight.
+* Exam sessions: each answer write is a single hash-field set, so the last
+  write wins per question. The header (position, question ids, timer) is
+  replaced whole on navigation. One browser session drives one exam, so
+  there are no competing writers in practice.
+* Adaptive question statistics stay in a host-local mmap. They are shared
+  by workers on one host and approximate across hosts.
+"""
+import os, sqlite3, threading, time, uuid
+from contextlib import contextmanager
+
+SHARED_STORE_URL = os.environ.get("SHARED_STORE_URL")
+
+# -------------------------------
+# Local stand-in (SQLite, WAL)
+# -------------------------------
+class SqliteKV:
+    # Implements the subset of Redis commands the app uses, with the same
+    # semantics, so either backend can sit behind the same code.
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)")
+            con.execute("CREATE TABLE IF NOT EXISTS hashes (key TEXT, field TEXT, value TEXT, PRIMARY KEY (key, field))")
+            con.execute("CREATE TABLE IF NOT EXISTS lists (key TEXT, idx INTEGER, value TEXT, PRIMARY KEY (key, idx))")
+            con.execute("CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    @contextmanager
+    def _write(self):
+        con = self._conn()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value):
+        with self._write() as con:
+            con.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?,?)", (key, value))
+
+    def delete(self, *keys):
+        with self._write() as con:
+            for key in keys:
+                con.execute("DELETE FROM kv WHERE key = ?", (key,))
+                con.execute("DELETE FROM hashes WHERE key = ?", (key,))
+                con.execute("DELETE FROM lists WHERE key = ?", (key,))
+
+    def hget(self, key, field):
+        row = self._conn().execute("SELECT value FROM hashes WHERE key = ? AND field = ?", (key, str(field))).fetchone()
+        return row[0] if row else None
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        with self._write() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO hashes (key, field, value) VALUES (?,?,?)",
+                [(key, str(f), v) for f, v in items.items()],
+            )
+
+    def hdel(self, key, *fields):
+        with self._write() as con:
+            con.executemany("DELETE FROM hashes WHERE key = ? AND field = ?", [(key, str(f)) for f in fields])
+
+    def hgetall(self, key):
+        return dict(self._conn().execute("SELECT field, value FROM hashes WHERE key = ?", (key,)))
+
+    def rpush(self, key, *values):
+        with self._write() as con:
+            n = self._len(con, key)
+            con.executemany(
+                "INSERT INTO lists (key, idx, value) VALUES (?,?,?)",
+                [(key, n + i, v) for i, v in enumerate(values)],
+            )
+        return n + len(values)
+
+    def _len(self, con, key):
+        # Lists are append-only, so the length is the max index + 1 (an index seek).
+        return con.execute("SELECT COALESCE(MAX(idx), -1) + 1 FROM lists WHERE key = ?", (key,)).fetchone()[0]
+
+    def llen(self, key):
+        return self._len(self._conn(), key)
+
+    def lindex(self, key, idx):
+        if idx < 0:
+            idx += self.llen(key)
+        row = self._conn().execute("SELECT value FROM lists WHERE key = ? AND idx = ?", (key, idx)).fetchone()
+        return row[0] if row else None
+
+    def lrange(self, key, start, stop):
+        # Redis semantics: inclusive stop, negative indexes from the end.
+        if start < 0 or stop < 0:
+            n = self.llen(key)
+            start, stop = (start + n if start < 0 else start), (stop + n if stop < 0 else stop)
+        return [v for (v,) in self._conn().execute(
+            "SELECT value FROM lists WHERE key = ? AND idx BETWEEN ? AND ? ORDER BY idx",
+            (key, max(start, 0), stop),
+        )]
+
+    def ltrim(self, key, start, stop):
+        # Keep [start, stop] (Redis semantics) and renumber from 0.
+        with self._write() as con:
+            n = self._len(con, key)
+            start, stop = (start + n if start < 0 else start), (stop + n if stop < 0 else stop)
+            start = max(start, 0)
+            con.execute("DELETE FROM lists WHERE key = ? AND (idx < ? OR idx > ?)", (key, start, stop))
+            if start:
+                # Two steps through negative indexes so no row collides
+                # with another's primary key mid-update.
+                con.execute("UPDATE lists SET idx = -(idx - ?) - 1 WHERE key = ?", (start, key))
+                con.execute("UPDATE lists SET idx = -idx - 1 WHERE key = ?", (key,))
+
+    @contextmanager
+    def lock(self, name, timeout=10.0):
+        # Lease-style lock like Redis SET NX PX: a crashed holder's lock
+        # expires instead of wedging every worker.
+        owner = str(uuid.uuid4())
+        while True:
+            with self._write() as con:
+                con.execute("DELETE FROM locks WHERE name = ? AND expires < ?", (name, time.time()))
+                got = con.execute(
+                    "INSERT OR IGNORE INTO locks (name, owner, expires) VALUES (?,?,?)",
+                    (name, owner, time.time() + timeout),
+                ).rowcount
+            if got:
+                break
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            with self._write() as con:
+                con.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+# -------------------------------
+# Redis
+# -------------------------------
+class RedisKV:
+    def __init__(self, url):
+        import redis  # optional dependency, only needed for redis:// URLs
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+
+    def __getattr__(self, name):
+        return getattr(self.r, name)
+
+    @contextmanager
+    def lock(self, name, timeout=10.0):
+        with self.r.lock(f"lock:{name}", timeout=timeout, blocking_timeout=None):
+            yield
+
+_stores = {}
+
+def get_shared_store(url=None):
+    url = url or SHARED_STORE_URL
+    if not url:
+        raise ValueError("SHARED_STORE_URL is not set")
+    if url not in _stores:
+        if url.startswith("sqlite:///"):
+            _stores[url] = SqliteKV(url[len("sqlite:///"):])
+        elif url.startswith(("redis://", "rediss://", "unix://")):
+            _stores[url] = RedisKV(url)
+        else:
+            raise ValueError(f"Unsupported shared store URL: {url}")
+    return _stores[url]
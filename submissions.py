@@ -0,0 +1,246 @@
+# submissions.py
+import json, os, queue, threading, time, traceback, uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from profiling import metrics
+
+WORKER_ID = os.environ.get("WORKER_ID", "0")  # one spool per app process
+SPOOL_FILE = f"submissions.{WORKER_ID}.spool.jsonl"
+
+def make_record(job, score, details, timestamp=None):
+    # timestamp is when the record is stored: the history is kept in that
+    # order, and replayed or regraded jobs are stored after newer ones.
+    return {
+        "id": job["id"],
+        "section": job["section"],
+        "difficulty": job.get("difficulty"),
+        "timestamp": timestamp or datetime.utcnow().isoformat(),
+        "submitted_at": job["submitted_at"],
+        "score": round(float(score), 2) if score is not None else 0,
+        "details": details
+    }
+
+def _append_lines(path, items):
+    payload = "".join(json.dumps(i, default=str) + "\n" for i in items).encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _rewrite_lines(path, items):
+    # Atomic: a crash leaves either the old file or the new one.
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write("".join(json.dumps(i, default=str) + "\n" for i in items).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _read_lines(path):
+    try:
+        with open(path, "rb") as f:
+            return [json.loads(line) for line in f if line.endswith(b"\n") and line.strip()]
+    except OSError:
+        return []
+
+# -------------------------------
+# Queue + background worker
+# -------------------------------
+class SubmissionQueue:
+    # submit() fsyncs the job to a spool file and returns at once; a worker
+    # thread grades and persists jobs in batches, then runs the hooks
+    # (rollups, adaptive stats). Each hook that succeeds is marked per job
+    # in a sidecar file, and the job is marked done once all have run.
+    # On start, jobs not marked done are checked against the store: stored
+    # ones only get the hooks they are missing, the rest are graded again.
+    #
+    # hooks maps a name to fn(jobs, records), or is a single callable. A
+    # hook is retried and replayed on its own, so it must not mind being
+    # called again for a batch it failed on.
+    #
+    # scorer may be a Scorer or a zero-argument callable returning one; a
+    # callable is only invoked on the worker thread, when first needed.
+    def __init__(self, store, scorer, hooks=None, spool=SPOOL_FILE, batch_size=32, batch_wait=0.05,
+                 retries=3, retry_wait=1.0):
+        self.store = store
+        self._scorer = scorer
+        self.hooks = {"on_persisted": hooks} if callable(hooks) else dict(hooks or {})
+        self.spool = spool
+        self.done_file = spool + ".done"
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._outstanding = 0  # jobs submitted or replayed and not yet processed
+        self._results = OrderedDict()
+        # Snapshot what an earlier run left behind before submit() can add
+        # to the spool; the store lookup for it happens on the worker.
+        done, self._hooked = self._read_marks()
+        self._leftover = [j for j in _read_lines(self.spool) if j["id"] not in done]
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, section, difficulty, qs, answers, user=None, times=None):
+        job = {
+            "id": str(uuid.uuid4()),
+            "section": section,
+            "difficulty": difficulty,
+            "qs": qs,
+            "answers": answers,
+            "times": times or [0.0] * len(qs),
+            "user": user,
+            "submitted_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            _append_lines(self.spool, [job])
+            self._outstanding += 1
+        self._queue.put(job)
+        return job["id"]
+
+    @property
+    def scorer(self):
+        if callable(self._scorer):
+            self._scorer = self._scorer()
+        return self._scorer
+
+    def result(self, job_id):
+        # None while pending, the stored record once persisted, or
+        # {"error": ...} if grading kept failing (the job stays spooled and
+        # is graded again when the queue next starts).
+        return self._results.get(job_id)
+
+    def _read_marks(self):
+        # -> (ids marked done, {id: names of the hooks that ran})
+        done, hooked = set(), {}
+        for mark in _read_lines(self.done_file):
+            if "hook" in mark:
+                hooked.setdefault(mark["id"], set()).add(mark["hook"])
+            else:
+                done.add(mark["id"])
+        return done, {i: names for i, names in hooked.items() if i not in done}
+
+    def _replay(self):
+        jobs, self._leftover = self._leftover, []
+        if not jobs:
+            self._compact()
+            return
+        # A crash between persisting and marking must not duplicate
+        # records: anything already in the store only needs its hooks.
+        wanted = {j["id"] for j in jobs}
+        stored = {r["id"]: r for r in self.store.iter_records() if r.get("id") in wanted}
+        unhooked = [j for j in jobs if j["id"] in stored]
+        if unhooked:
+            self._run_hooks(unhooked, [stored[j["id"]] for j in unhooked])
+        regrade = [j for j in jobs if j["id"] not in stored]
+        with self._lock:
+            self._outstanding += len(regrade)
+        for job in regrade:
+            self._queue.put(job)
+        if not regrade:
+            self._compact()
+
+    def _compact(self):
+        # Once idle, keep only jobs whose hooks never completed (grading or
+        # hooks kept failing); they are picked up again on the next start.
+        with self._lock:
+            if self._outstanding:
+                return
+            done, hooked = self._read_marks()
+            keep = [j for j in _read_lines(self.spool) if j["id"] not in done]
+            marks = [{"id": j["id"], "hook": name} for j in keep for name in sorted(hooked.get(j["id"], ()))]
+            # Spool first: a crash in between leaves extra marks, not lost jobs.
+            _rewrite_lines(self.spool, keep)
+            _rewrite_lines(self.done_file, marks)
+
+    def _run(self):
+        try:
+            self._replay()  # full store scan: keep it off the request thread
+        except Exception:
+            traceback.print_exc()
+        while True:
+            jobs = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(jobs) < self.batch_size:
+                try:
+                    jobs.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._process(jobs)
+
+    def _retrying(self, what, fn):
+        # Transient failures (e.g. a locked database) get a few tries.
+        for attempt in range(self.retries):
+            try:
+                return fn()
+            except Exception:
+                traceback.print_exc()
+                if attempt == self.retries - 1:
+                    raise
+                print(f"{what} failed, retrying ({attempt + 1}/{self.retries - 1})")
+                time.sleep(self.retry_wait * 2 ** attempt)
+
+    def _process(self, jobs):
+        try:
+            records = self._persist(jobs)
+        except Exception as e:
+            # The jobs stay in the spool and are graded again on the next start.
+            for job in jobs:
+                self._remember(job["id"], {"error": str(e)})
+        else:
+            for rec in records:
+                self._remember(rec["id"], rec)
+            t0 = time.perf_counter()
+            self._run_hooks(jobs, records)
+            metrics.observe("hooks", (time.perf_counter() - t0) * 1000)
+        finally:
+            with self._lock:
+                self._outstanding -= len(jobs)
+        if self._queue.empty():
+            self._compact()
+
+    def _persist(self, jobs):
+        # Grading is retried; the append is not, so a retry can never
+        # write a record twice.
+        from scoring import grade_attempts  # numpy stays off the page-render path
+        t0 = time.perf_counter()
+        attempts = [(j["section"], j["qs"], j["answers"]) for j in jobs]
+        graded = self._retrying("grading", lambda: grade_attempts(self.scorer, attempts))
+        t1 = time.perf_counter()
+        stored_at = datetime.utcnow().isoformat()
+        records = [make_record(job, avg, details, stored_at) for job, (avg, details) in zip(jobs, graded)]
+        self.store.append_many(records)
+        metrics.observe("grading", (t1 - t0) * 1000)
+        metrics.observe("persist", (time.perf_counter() - t1) * 1000)
+        return records
+
+    def _run_hooks(self, jobs, records):
+        # The attempts are saved whatever happens here; a hook that keeps
+        # failing is logged and left unmarked, so only it runs again on
+        # restart.
+        complete = True
+        for name, hook in self.hooks.items():
+            todo = [(j, r) for j, r in zip(jobs, records) if name not in self._hooked.get(j["id"], ())]
+            if not todo:
+                continue
+            try:
+                self._retrying(name, lambda: hook([j for j, _ in todo], [r for _, r in todo]))
+                _append_lines(self.done_file, [{"id": j["id"], "hook": name} for j, _ in todo])
+            except Exception:
+                complete = False
+                print(f"{name} failed for {len(todo)} saved attempts; will retry on restart")
+        if complete:
+            try:
+                _append_lines(self.done_file, [{"id": j["id"]} for j in jobs])
+            except OSError:
+                traceback.print_exc()
+            for j in jobs:
+                self._hooked.pop(j["id"], None)
+
+    def _remember(self, job_id, value, keep=1000):
+        self._results[job_id] = value
+        while len(self._results) > keep:
+            self._results.popitem(last=False)
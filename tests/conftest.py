@@ -0,0 +1,23 @@
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_store import BACKENDS, SharedHistoryStore
+
+def make_store(backend, tmp_path):
+    if backend == "shared":
+        return SharedHistoryStore(f"sqlite:///{tmp_path / 'shared.db'}")
+    return BACKENDS[backend](str(tmp_path / f"history.{backend}"))
+
+def record(i, section="Practice", day=1):
+    return {
+        "id": f"r{i}", "section": section, "difficulty": "Easy",
+        "timestamp": f"2025-01-{day:02d}T00:00:{i % 60:02d}", "score": float(i % 100),
+        "details": [{"q": f"Q{i}", "answer": "a", "score": 1.0}],
+    }
+
+@pytest.fixture(params=sorted(BACKENDS))
+def store(request, tmp_path):
+    return make_store(request.param, tmp_path)
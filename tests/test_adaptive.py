@@ -0,0 +1,44 @@
+import sqlite3
+
+from adaptive import AdaptiveEngine
+from question_bank import DEFAULT_BANK, DictBank
+
+def make_engine(tmp_path):
+    return AdaptiveEngine(DictBank(DEFAULT_BANK), str(tmp_path / "stats.bin"), str(tmp_path / "users.db"))
+
+def test_ability_persists_per_user(tmp_path):
+    engine = make_engine(tmp_path)
+    qids = list(DictBank(DEFAULT_BANK).indices("Practice", "Easy"))[:3]
+    theta = engine.record("alice", qids, [1.0, 1.0, 1.0], [5.0, 5.0, 5.0])
+    assert theta > 0
+    assert make_engine(tmp_path).ability("alice") == theta
+    assert engine.ability("bob") == 0.0
+    assert engine.question_stats(qids[0])["attempts"] == 1
+
+def test_anonymous_attempts_update_questions_only(tmp_path):
+    engine = make_engine(tmp_path)
+    engine.record(None, [0], [0.0], [1.0])
+    assert engine.question_stats(0)["attempts"] == 1
+    con = sqlite3.connect(str(tmp_path / "users.db"))
+    assert con.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+def test_stats_follow_the_stable_id_when_the_bank_changes(tmp_path):
+    bank = DictBank(DEFAULT_BANK)
+    engine = make_engine(tmp_path)
+    qid = bank.indices("Practice", "Easy")[0]
+    engine.record(None, [qid], [1.0], [1.0])
+    grown = {"Practice": {"Easy": [{"q": "A brand new question?", "a": "yes"}] + DEFAULT_BANK["Practice"]["Easy"]}}
+    grown.update({s: d for s, d in DEFAULT_BANK.items() if s != "Practice"})
+    rebuilt = DictBank(grown)
+    moved = rebuilt.qid_for(bank.question_id(qid))
+    assert moved == qid + 1
+    engine = AdaptiveEngine(rebuilt, str(tmp_path / "stats.bin"), str(tmp_path / "users.db"))
+    assert engine.question_stats(moved)["attempts"] == 1
+    assert engine.question_stats(qid)["attempts"] == 0
+
+def test_record_with_a_key_applies_once(tmp_path):
+    engine = make_engine(tmp_path)
+    theta = engine.record("alice", [0, 1], [1.0, 0.0], [1.0, 1.0], key="job-1")
+    assert engine.record("alice", [0, 1], [1.0, 0.0], [1.0, 1.0], key="job-1") == theta
+    assert engine.question_stats(0)["attempts"] == 1
+    assert make_engine(tmp_path).ability("alice") == theta
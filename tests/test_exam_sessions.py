@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from exam_sessions import ExamSessionStore, SharedExamSessionStore
+from question_bank import DictBank
+
+QS = [{"q": f"Question {i}?", "a": str(i)} for i in range(4)]
+
+def bank(qs):
+    return DictBank({"Practice": {"Easy": qs}})
+
+@pytest.fixture(params=["sqlite", "shared"])
+def make(request, tmp_path):
+    if request.param == "sqlite":
+        return lambda b: ExamSessionStore(str(tmp_path / "sessions.db"), bank=b)
+    return lambda b: SharedExamSessionStore(f"sqlite:///{tmp_path / 'shared.db'}", bank=b)
+
+def start(store, qids):
+    exam = {"section": "Practice", "diff": "Easy", "qids": qids, "times": [1.0] * len(qids), "idx": 2}
+    sid = store.create("user", exam)
+    for i in range(len(qids)):
+        store.save_answer(sid, i, f"answer {i}")
+    return sid
+
+def test_session_survives_a_reordered_bank(make):
+    sid = start(make(bank(QS)), [0, 1, 2, 3])
+    exam = make(bank(QS[::-1])).load(sid)
+    assert exam["qids"] == [3, 2, 1, 0]
+    assert exam["answers"] == ["answer 0", "answer 1", "answer 2", "answer 3"]
+    assert exam["idx"] == 2
+
+def test_removed_questions_are_dropped_with_their_answers(make):
+    sid = start(make(bank(QS)), [0, 1, 2, 3])
+    store = make(bank([QS[0], QS[2], QS[3]]))
+    exam = store.load(sid)
+    assert exam["qids"] == [0, 1, 2]
+    assert exam["answers"] == ["answer 0", "answer 2", "answer 3"]
+    assert exam["idx"] == 1  # still on "Question 2?"
+    store.save_answer(sid, 2, "edited")
+    assert store.load(sid)["answers"] == ["answer 0", "answer 2", "edited"]
+
+def test_session_with_no_questions_left_is_gone(make):
+    sid = start(make(bank(QS)), [1])
+    assert make(bank([QS[0]])).load(sid) is None
+
+def test_sweep_drops_only_abandoned_sessions(make):
+    store = make(None)
+    store.ttl = 60
+    old = start(store, [0, 1])
+    assert store.sweep(now=time.time() + 30) == 0
+    assert store.sweep(now=time.time() + 61) == 1
+    assert store.load(old) is None
+    kept = start(store, [2])
+    assert store.sweep() == 0
+    assert store.load(kept)["answers"] == ["answer 0"]
+    store.finish(kept)
+    assert store.sweep(now=time.time() + 61) == 0
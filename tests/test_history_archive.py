@@ -0,0 +1,60 @@
+import pytest
+
+import history_archive
+from conftest import record
+from history_archive import archive_dir, compact_history, iter_history, read_manifest
+
+@pytest.fixture(autouse=True)
+def in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # compaction writes the rollups file here
+
+def fill(store):
+    store.append_many([record(i, day=1 + i // 10) for i in range(30)])  # days 1-3
+
+def ids(recs):
+    return [r["id"] for r in recs]
+
+def test_compact_moves_old_records_to_the_archive(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(history_archive, "HISTORY_ARCHIVE_DIR", str(tmp_path / "archive"))
+    fill(store)
+    assert compact_history(store, "2025-01-03", segment_size=8, log=lambda msg: None) == 20
+    assert ids(store.iter_records()) == [f"r{i}" for i in range(20, 30)]
+    assert ids(iter_history(store)) == [f"r{i}" for i in range(30)]
+    assert ids(iter_history(store, start="2025-01-02", end="2025-01-02T23:59:59")) == [f"r{i}" for i in range(10, 20)]
+    assert read_manifest(archive_dir(store))["pending"] is None
+
+def test_interrupted_compaction_is_finished_once(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(history_archive, "HISTORY_ARCHIVE_DIR", str(tmp_path / "archive"))
+    fill(store)
+    drop_head = store.drop_head
+    def crash(n):
+        raise OSError("killed")
+    monkeypatch.setattr(store, "drop_head", crash)
+    with pytest.raises(OSError):
+        compact_history(store, "2025-01-02", log=lambda msg: None)
+    assert read_manifest(archive_dir(store))["pending"] == {"first_id": "r0", "count": 10}
+    monkeypatch.setattr(store, "drop_head", drop_head)
+    # The next run drops the archived head first, then has nothing left to move.
+    assert compact_history(store, "2025-01-02", log=lambda msg: None) == 0
+    assert ids(store.iter_records()) == [f"r{i}" for i in range(10, 30)]
+    assert ids(iter_history(store)) == [f"r{i}" for i in range(30)]
+
+def test_pending_after_the_drop_is_not_dropped_again(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(history_archive, "HISTORY_ARCHIVE_DIR", str(tmp_path / "archive"))
+    fill(store)
+    compact_history(store, "2025-01-02", log=lambda msg: None)
+    # Crash between the drop and clearing "pending": the head moved on.
+    manifest = read_manifest(archive_dir(store))
+    manifest["pending"] = {"first_id": "r0", "count": 10}
+    history_archive._write_json(history_archive._manifest_path(archive_dir(store)), manifest)
+    compact_history(store, "2025-01-02", log=lambda msg: None)
+    assert ids(store.iter_records()) == [f"r{i}" for i in range(10, 30)]
+
+def test_shared_store_needs_a_configured_archive(tmp_path):
+    from conftest import make_store
+    store = make_store("shared", tmp_path)
+    fill(store)
+    assert archive_dir(store) is None
+    with pytest.raises(ValueError):
+        compact_history(store, "2025-01-02", log=lambda msg: None)
+    assert ids(iter_history(store)) == [f"r{i}" for i in range(30)]
@@ -0,0 +1,111 @@
+import multiprocessing, os, threading
+
+from conftest import record
+from history_store import HistoryCache, JsonHistoryStore, JsonlHistoryStore
+
+def test_read_since_is_incremental(store):
+    store.append_many([record(0), record(1)])
+    recs, cursor, reset = store.read_since(None)
+    assert [r["id"] for _, r in recs] == ["r0", "r1"]
+    store.append(record(2))
+    recs, cursor, reset = store.read_since(cursor)
+    if isinstance(store, JsonHistoryStore):
+        # Whole-file format: any change is a full reload.
+        assert reset and [r["id"] for _, r in recs] == ["r0", "r1", "r2"]
+    else:
+        assert not reset and [r["id"] for _, r in recs] == ["r2"]
+    assert store.read_since(cursor)[0] == []
+    assert store.get(recs[-1][0])["id"] == "r2"
+    assert store.count() == 3
+
+def test_jsonl_ignores_partial_tail(tmp_path):
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    store.append(record(0))
+    with open(store.path, "ab") as f:
+        f.write(b'{"id": "half')  # a writer died mid-line
+    recs, cursor, _ = store.read_since(None)
+    assert [r["id"] for _, r in recs] == ["r0"]
+    assert [r["id"] for r in store.iter_records()] == ["r0"]
+
+def test_jsonl_replaced_file_resets_cursor(tmp_path):
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    store.append_many([record(0), record(1)])
+    _, cursor, _ = store.read_since(None)
+    tmp = store.path + ".new"
+    with open(tmp, "w") as f:
+        f.write('{"id": "x"}\n')
+    os.replace(tmp, store.path)
+    recs, _, reset = store.read_since(cursor)
+    assert reset and [r["id"] for _, r in recs] == ["x"]
+
+def _append_many(path, start):
+    store = JsonlHistoryStore(path)
+    for i in range(start, start + 50):
+        store.append(record(i))
+
+def test_jsonl_concurrent_appends_do_not_interleave(tmp_path):
+    path = str(tmp_path / "h.jsonl")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_many, args=(path, n * 50)) for n in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    ids = sorted(int(r["id"][1:]) for r in JsonlHistoryStore(path).iter_records())
+    assert ids == list(range(200))
+
+def test_cache_query_pages_newest_first(store):
+    store.append_many([record(i, "A" if i % 2 else "B", day=1 + i // 10) for i in range(40)])
+    cache = HistoryCache(store).refresh()
+    total, rows = cache.query(section="A", offset=0, limit=5)
+    assert total == 20 and [r["id"] for r in rows] == ["r39", "r37", "r35", "r33", "r31"]
+    total, _ = cache.query(start="2025-01-02", end="2025-01-02T23:59:59")
+    assert total == 10
+    assert cache.details(rows[0]["pos"])[0]["q"] == "Q39"
+
+def test_cache_maps_missing_section_to_unknown(tmp_path):
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    store.append_many([dict(record(0), section=None), record(1)])
+    cache = HistoryCache(store).refresh()
+    assert sorted(cache.sections()) == ["Practice", "Unknown"]
+    assert cache.query(section="Unknown")[0] == 1
+
+def test_cache_query_during_concurrent_refresh(tmp_path):
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    cache = HistoryCache(store)
+    errors = []
+
+    def writer():
+        for i in range(300):
+            store.append(record(i, section=f"S{i}"))
+            cache.refresh()
+
+    def reader():
+        try:
+            for _ in range(300):
+                cache.sections()
+                cache.query(limit=5)
+        except Exception as e:  # e.g. dict changed size during iteration
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and len(cache.sections()) == 300
+
+def test_read_since_across_drop_head(store):
+    store.append_many([record(i) for i in range(5)])
+    cache = HistoryCache(store).refresh()
+    _, cursor, _ = store.read_since(None)
+    store.drop_head(2)
+    store.append(record(5))
+    recs, _, reset = store.read_since(cursor)
+    ids = [r["id"] for _, r in recs]
+    # Either a full reload of what is left, or just the new tail.
+    assert ids == (["r2", "r3", "r4", "r5"] if reset else ["r5"])
+    assert [store.get(loc)["id"] for loc, _ in recs] == ids
+    assert [r["id"] for r in store.iter_records()] == ["r2", "r3", "r4", "r5"]
+    total, rows = cache.refresh().query(limit=10)
+    assert total == 4 and sorted(r["id"] for r in rows) == ["r2", "r3", "r4", "r5"]
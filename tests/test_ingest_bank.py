@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from ingest_bank import NearDuplicateIndex, ingest, read_records, validate
+from question_bank import CompiledBank, stable_id
+
+WORDS = ("stack queue heap tree graph array list node edge path sort merge quick binary hash "
+         "table key value index pointer memory cache page frame loop branch call return stack frame").split()
+LONG = " ".join(WORDS)
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_csv_options_as_json_or_pipes(tmp_path):
+    path = write(tmp_path / "b.csv",
+                 'section,difficulty,q,a,options\n'
+                 'MCQ Quiz,Easy,Pick one,b,"[""a"", ""b""]"\n'
+                 'MCQ Quiz,Easy,Pick two,d,c | d\n'
+                 'MCQ Quiz,Easy,Broken,a,"[oops"\n')
+    recs = list(read_records(path))
+    assert recs[0] == (f"{path}:2", {"section": "MCQ Quiz", "difficulty": "Easy", "q": "Pick one", "a": "b", "options": ["a", "b"]})
+    assert recs[1][1]["options"] == ["c", "d"]
+    assert recs[2][0] == f"{path}:4" and isinstance(recs[2][1], ValueError)
+
+def test_jsonl_bad_line_is_reported_in_place(tmp_path):
+    path = write(tmp_path / "b.jsonl", '{"q": "ok"}\n\nnot json\n')
+    recs = list(read_records(path))
+    assert recs[0] == (f"{path}:1", {"q": "ok"})
+    assert recs[1][0] == f"{path}:3" and isinstance(recs[1][1], ValueError)
+
+@pytest.mark.parametrize("rec, reason", [
+    ({"difficulty": "Easy", "q": "Q", "a": "A"}, "missing section"),
+    ({"section": "Practice", "difficulty": "Easy", "a": "A"}, "missing question"),
+    ({"section": "Practice", "difficulty": "Easy", "q": "Q"}, "missing answer"),
+    ({"section": "MCQ Quiz", "difficulty": "Easy", "q": "Q", "a": "A", "options": ["A"]}, "two distinct"),
+    ({"section": "MCQ Quiz", "difficulty": "Easy", "q": "Q", "a": "C", "options": ["A", "B"]}, "not one of"),
+    ({"section": "Practice", "difficulty": "Easy", "q": "Q", "a": "A", "options": "A|B"}, "list of strings"),
+])
+def test_validate_rejects(rec, reason):
+    with pytest.raises(ValueError, match=reason):
+        validate(rec)
+
+def test_validate_assigns_stable_ids():
+    _, _, q = validate({"section": "Practice", "difficulty": "Easy", "q": " What is X? ", "a": "x"})
+    assert q == {"id": stable_id("Practice", "What is X?"), "q": "What is X?", "a": "x"}
+    assert validate({"section": "Practice", "difficulty": "Easy", "q": "Q", "a": "A", "id": 7})[2]["id"] == "7"
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.8, 0.9])
+def test_band_layout_sits_below_the_threshold(threshold):
+    bands, rows = NearDuplicateIndex._bands(threshold, 64)
+    assert bands * rows == 64
+    assert (1 / bands) ** (1 / rows) <= 0.9 * threshold
+
+def test_near_duplicates_above_and_below_the_threshold():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add("Practice", "a", LONG) is None
+    # One word changed out of 30: Jaccard over 3-word shingles ~0.87.
+    close = index.add("Practice", "b", LONG.rsplit(" ", 1)[0] + " recursion")
+    assert close and close[0] == "a" and close[1] >= 0.8
+    # Every third word changed: far below the threshold.
+    far = " ".join("other" if i % 3 == 0 else w for i, w in enumerate(WORDS))
+    assert index.add("Practice", "c", far) is None
+    # Buckets are per section.
+    assert index.add("Mock Interview", "d", LONG) is None
+
+def test_ingest_dedups_and_compiles(tmp_path):
+    rows = [
+        {"section": "Practice", "difficulty": "Easy", "q": LONG, "a": "a"},
+        {"section": "Practice", "difficulty": "Easy", "q": LONG.upper() + "!", "a": "a"},  # exact (normalized)
+        {"section": "Practice", "difficulty": "Hard", "q": LONG.rsplit(" ", 1)[0] + " recursion", "a": "b"},  # near
+        {"section": "Practice", "difficulty": "Hard", "q": "Define a heap.", "a": "c"},
+        {"section": "MCQ Quiz", "difficulty": "Easy", "q": "Pick", "a": "z", "options": ["x", "y"]},  # invalid
+    ]
+    src = write(tmp_path / "in.jsonl", "".join(json.dumps(r) + "\n" for r in rows))
+    out, report = str(tmp_path / "bank.qbk"), str(tmp_path / "rejects.jsonl")
+    stats = ingest([src], out, report=report, log=lambda msg: None)
+    assert stats == {"read": 5, "accepted": 2, "invalid": 1, "exact_duplicates": 1, "near_duplicates": 1, "written": 2}
+    kinds = [json.loads(line)["kind"] for line in open(report, encoding="utf-8")]
+    assert sorted(kinds) == ["exact_duplicates", "invalid", "near_duplicates"]
+    bank = CompiledBank(out)
+    assert [bank.question(qid)["q"] for qid in range(len(bank))] == [LONG, "Define a heap."]
+    assert bank.qid_for(stable_id("Practice", "Define a heap.")) == 1
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("ingest-")] == []
+
+def test_ingest_can_keep_near_duplicates(tmp_path):
+    rows = [
+        {"section": "Practice", "difficulty": "Easy", "q": LONG, "a": "a"},
+        {"section": "Practice", "difficulty": "Easy", "q": LONG.rsplit(" ", 1)[0] + " recursion", "a": "b"},
+    ]
+    src = write(tmp_path / "in.json", json.dumps(rows))
+    stats = ingest([src], str(tmp_path / "bank.qbk"), drop_near=False, log=lambda msg: None)
+    assert stats["near_duplicates"] == 1 and stats["written"] == 2
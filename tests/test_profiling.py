@@ -0,0 +1,20 @@
+import json
+
+from profiling import Rerun, metrics
+
+def test_finish_writes_rerun_and_periodic_metrics(tmp_path, monkeypatch):
+    path = str(tmp_path / "metrics.jsonl")
+    trace = Rerun()
+    with trace.span("stage"):
+        pass
+    monkeypatch.setattr(metrics, "_dumped", 0.0)  # dump is due
+    trace.finish("s1", path)
+    trace.finish("s1", path)  # idempotent
+    lines = [json.loads(l) for l in open(path)]
+    assert [l["kind"] for l in lines] == ["rerun", "metrics"]
+    assert lines[0]["spans"][0][0] == "stage"
+    row = next(r for r in lines[1]["rows"] if r["stage"] == "stage")
+    assert [b for b, _ in row["buckets"]] == [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, "+Inf"]
+    assert sum(n for _, n in row["buckets"]) == row["count"]
+    Rerun().finish("s2", path)  # not due again yet
+    assert len(open(path).readlines()) == 3
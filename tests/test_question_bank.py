@@ -0,0 +1,37 @@
+from question_bank import CompiledBank, DEFAULT_BANK, DictBank, compile_bank, stable_id
+
+def test_compiled_bank_keeps_stable_ids(tmp_path):
+    bank = DictBank(DEFAULT_BANK)
+    path = str(tmp_path / "bank.qbk")
+    compile_bank(bank, path)
+    compiled = CompiledBank(path)
+    assert len(compiled) == len(bank)
+    for qid in (0, len(bank) // 2, len(bank) - 1):
+        assert compiled.question_id(qid) == bank.question_id(qid)
+        assert compiled.qid_for(bank.question_id(qid)) == qid
+        assert compiled.question(qid)["id"] == bank.question_id(qid)
+    assert compiled.qid_for("no-such-id") is None
+
+def test_explicit_ids_win_over_the_text_hash():
+    bank = DictBank({"Practice": {"Easy": [{"id": "q-1", "q": "One?", "a": "1"}, {"q": "Two?", "a": "2"}]}})
+    assert bank.question_id(0) == "q-1"
+    assert bank.question_id(1) == stable_id("Practice", "Two?")
+
+def test_default_bank_ids_are_unique():
+    bank = DictBank(DEFAULT_BANK)
+    ids = [bank.question_id(qid) for qid in range(len(bank))]
+    assert len(set(ids)) == len(ids)
+
+def test_repeated_ids_are_numbered_in_bank_order(tmp_path):
+    data = {"Practice": {
+        "Medium": [{"q": "Sum of 1..20?", "a": "210"}],
+        "Hard": [{"q": "Sum of 1..20?", "a": "210"}, {"id": "x", "q": "A?", "a": "a"}, {"id": "x", "q": "B?", "a": "b"}],
+    }}
+    bank = DictBank(data)
+    first = stable_id("Practice", "Sum of 1..20?")
+    assert [bank.question_id(qid) for qid in range(4)] == [first, first + "#2", "x", "x#2"]
+    assert [bank.qid_for(bank.question_id(qid)) for qid in range(4)] == [0, 1, 2, 3]
+    path = str(tmp_path / "bank.qbk")
+    compile_bank(bank, path)
+    compiled = CompiledBank(path)
+    assert [compiled.question_id(qid) for qid in range(4)] == [first, first + "#2", "x", "x#2"]
@@ -0,0 +1,16 @@
+import random
+
+from sampling import SeenSet, sample_questions
+
+def test_seen_set_evicts_least_recently_served():
+    seen = SeenSet(10, capacity=3)
+    seen.update([1, 2, 3])
+    seen.add(1)  # served again, so 2 is now the oldest
+    seen.add(4)
+    assert 1 in seen and 2 not in seen and 3 in seen and 4 in seen
+
+def test_sample_prefers_unseen():
+    seen = SeenSet(100)
+    seen.update(range(50))
+    picked = sample_questions(range(100), 10, random.Random(0), seen)
+    assert len(set(picked)) == 10 and not any(q in seen for q in picked)
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from question_bank import DEFAULT_BANK, DictBank
+from scoring import MAX_ANSWER_TOKENS, HashedEmbeddingScorer, normalize_text
+
+def test_normalize_caps_tokens():
+    assert len(normalize_text("word " * 100000).split()) == MAX_ANSWER_TOKENS
+
+def test_long_answer_scores_like_its_head():
+    scorer = HashedEmbeddingScorer(DictBank(DEFAULT_BANK))
+    ref = DEFAULT_BANK["Mock Interview"]["Easy"][0]["a"]
+    head = "binary search halves the range each step "
+    assert scorer.similarity(head * 10 + "x " * 1000000, ref) == scorer.similarity(head * 10 + "y " * 1000000, ref)
+
+def test_tfidf_penalizes_words_no_reference_uses():
+    pytest.importorskip("sklearn")
+    from scoring import TfidfScoringEngine
+    scorer = TfidfScoringEngine(DictBank(DEFAULT_BANK))
+    assert scorer.similarity("Programming Language", "Programming Language") == 100.0
+    assert scorer.similarity("Programming Language " + "zzqx " * 200, "Programming Language") < 5
+    assert scorer.similarity("zzqx", "Programming Language") == 0.0
@@ -0,0 +1,24 @@
+import pytest
+
+from shared_store import SqliteKV
+
+@pytest.fixture
+def kv(tmp_path):
+    return SqliteKV(str(tmp_path / "kv.db"))
+
+@pytest.mark.parametrize("start, stop, kept", [
+    (0, -1, list("abcdef")),
+    (2, -1, list("cdef")),
+    (1, 3, list("bcd")),
+    (-2, -1, list("ef")),
+    (4, 1, []),
+])
+def test_ltrim_keeps_the_range_and_renumbers(kv, start, stop, kept):
+    kv.rpush("l", *"abcdef")
+    kv.ltrim("l", start, stop)
+    assert kv.llen("l") == len(kept)
+    assert kv.lrange("l", 0, -1) == kept
+    # Indexes start from 0 again, so appends and ranges line up.
+    kv.rpush("l", "z")
+    assert kv.lrange("l", len(kept), -1) == ["z"]
+    assert [kv.lindex("l", i) for i in range(len(kept))] == kept
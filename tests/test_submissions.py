@@ -0,0 +1,163 @@
+import sys, threading, time, types
+
+import pytest
+
+from history_store import JsonlHistoryStore
+from rollups import load_rollups, update_rollups
+from submissions import SubmissionQueue, _read_lines
+
+@pytest.fixture(autouse=True)
+def fake_grader(monkeypatch):
+    # Stands in for scoring.grade_attempts (numpy/sklearn): score = answer count.
+    calls = {"fail": 0}
+
+    def grade_attempts(scorer, attempts):
+        if calls["fail"]:
+            calls["fail"] -= 1
+            raise RuntimeError("grader down")
+        return [(len(answers), [{"q": q["q"], "score": 1.0} for q in qs]) for _, qs, answers in attempts]
+
+    monkeypatch.setitem(sys.modules, "scoring", types.SimpleNamespace(grade_attempts=grade_attempts))
+    return calls
+
+def wait(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while queue.result(job_id) is None:
+        assert time.monotonic() < deadline, "job never finished"
+        time.sleep(0.01)
+    return queue.result(job_id)
+
+def wait_idle(queue, timeout=5):
+    deadline = time.monotonic() + timeout
+    while queue._outstanding or not queue._queue.empty():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+def until(cond, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "condition never held"
+        time.sleep(0.01)
+
+def make(tmp_path, hook=None, scorer="scorer", **kw):
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    return store, SubmissionQueue(store, scorer, hook, spool=str(tmp_path / "spool.jsonl"), retry_wait=0, **kw)
+
+QS = [{"q": "Q1", "a": "a"}]
+
+def test_hook_failure_keeps_attempt_and_reruns_on_restart(tmp_path):
+    hooked = []
+    fail = {"on": True}
+
+    def hook(jobs, records):
+        if fail["on"]:
+            raise RuntimeError("rollups unavailable")
+        hooked.extend(r["id"] for r in records)
+
+    store, q = make(tmp_path, hook)
+    job_id = q.submit("Practice", "Easy", QS, ["x"])
+    assert wait(q, job_id)["id"] == job_id  # saved, not reported as failed
+    wait_idle(q)
+    assert store.count() == 1 and q._outstanding == 0
+    assert [j["id"] for j in _read_lines(q.spool)] == [job_id]  # kept for its hooks
+
+    fail["on"] = False
+    _, q2 = make(tmp_path, hook)
+    until(lambda: _read_lines(q2.spool) == [])
+    assert hooked == [job_id] and store.count() == 1
+
+def test_replay_does_not_duplicate_stored_records(tmp_path):
+    store, q = make(tmp_path)
+    job_id = q.submit("Practice", "Easy", QS, ["x"])
+    wait(q, job_id)
+    wait_idle(q)
+    # Simulate a crash after the append but before the done mark.
+    rec = store.load_all()[0]
+    with open(q.spool, "w") as f:
+        f.write('{"id": "%s", "section": "Practice", "difficulty": "Easy", "qs": [], "answers": [], '
+                '"times": [], "user": null, "submitted_at": "%s"}\n' % (job_id, rec["timestamp"]))
+    hooked = []
+    _, q2 = make(tmp_path, lambda jobs, records: hooked.extend(r["id"] for r in records))
+    until(lambda: hooked)
+    assert store.count() == 1 and hooked == [job_id]
+
+def test_grading_failure_is_regraded_on_restart(tmp_path, fake_grader):
+    fake_grader["fail"] = 3  # outlasts the retries
+    store, q = make(tmp_path)
+    job_id = q.submit("Practice", "Easy", QS, ["x"])
+    assert "error" in wait(q, job_id)
+    wait_idle(q)
+    assert store.count() == 0 and q._outstanding == 0
+    _, q2 = make(tmp_path)
+    assert wait(q2, job_id)["id"] == job_id
+    assert [r["id"] for r in store.load_all()] == [job_id]
+
+def test_scorer_factory_runs_on_worker_thread(tmp_path):
+    threads = []
+
+    def factory():
+        threads.append(threading.current_thread())
+        return "scorer"
+
+    _, q = make(tmp_path, scorer=factory)
+    assert threads == []
+    wait(q, q.submit("Practice", "Easy", QS, ["x"]))
+    assert threads and threads[0] is not threading.main_thread()
+
+def rollup_hooks(tmp_path, store, fail):
+    # rollups always works; adaptive fails while fail["n"] > 0.
+    path = str(tmp_path / "rollups.json")
+    adaptive = []
+
+    def rollups(jobs, records):
+        update_rollups(records, store, path)
+
+    def adaptive_hook(jobs, records):
+        if fail["n"]:
+            fail["n"] -= 1
+            raise RuntimeError("users db locked")
+        adaptive.extend(j["id"] for j in jobs)
+
+    return {"rollups": rollups, "adaptive": adaptive_hook}, adaptive, lambda: load_rollups(store, path).total()
+
+def test_retried_hook_does_not_reapply_the_others(tmp_path):
+    fail = {"n": 1}
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    hooks, adaptive, total = rollup_hooks(tmp_path, store, fail)
+    q = SubmissionQueue(store, "scorer", hooks, spool=str(tmp_path / "spool.jsonl"), retry_wait=0)
+    job_id = q.submit("Practice", "Easy", QS, ["x"])
+    wait(q, job_id)
+    until(lambda: adaptive)
+    wait_idle(q)
+    assert store.count() == 1 and total() == 1 and adaptive == [job_id]
+    assert _read_lines(q.spool) == []
+
+def test_replay_runs_only_the_missing_hook(tmp_path):
+    fail = {"n": 3}  # outlasts the retries
+    store = JsonlHistoryStore(str(tmp_path / "h.jsonl"))
+    hooks, adaptive, total = rollup_hooks(tmp_path, store, fail)
+    q = SubmissionQueue(store, "scorer", hooks, spool=str(tmp_path / "spool.jsonl"), retry_wait=0)
+    job_id = q.submit("Practice", "Easy", QS, ["x"])
+    wait(q, job_id)
+    wait_idle(q)
+    assert total() == 1 and adaptive == []
+    assert [j["id"] for j in _read_lines(q.spool)] == [job_id]
+    q2 = SubmissionQueue(store, "scorer", hooks, spool=str(tmp_path / "spool.jsonl"), retry_wait=0)
+    until(lambda: _read_lines(q2.spool) == [])
+    assert store.count() == 1 and total() == 1 and adaptive == [job_id]
+
+def test_records_are_stamped_in_store_order(tmp_path, fake_grader):
+    fake_grader["fail"] = 3
+    store, q = make(tmp_path)
+    late = q.submit("Practice", "Easy", QS, ["x"])
+    wait(q, late)
+    wait_idle(q)
+    _, q2 = make(tmp_path)
+    fresh = q2.submit("Practice", "Easy", QS, ["y"])
+    wait(q2, late)
+    wait(q2, fresh)
+    recs = store.load_all()
+    assert [r["timestamp"] for r in recs] == sorted(r["timestamp"] for r in recs)
+    by_id = {r["id"]: r for r in recs}
+    assert by_id[late]["submitted_at"] < by_id[fresh]["submitted_at"]